@@ -8,14 +8,8 @@ python launch.py chat
 """
 
 import sys
-import os
 
-# Add src directory to Python path
-script_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(script_dir, 'src')
-sys.path.insert(0, src_dir)
-
-# Import and run the CLI
+# Import and run the CLI (the script directory is already on sys.path)
 if __name__ == "__main__":
     try:
         from src.cli.main import main
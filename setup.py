@@ -1,5 +1,6 @@
 """Setup configuration for MistralAI Audio Analysis package"""
 
+import os
 from setuptools import setup, find_packages
 from pathlib import Path
 
@@ -15,14 +16,20 @@ if requirements_file.exists():
 else:
     requirements = [
         "requests>=2.28.0",
-        "pydantic>=1.10.0",
-        "python-dotenv>=0.19.0",
         "librosa>=0.9.0",
         "matplotlib>=3.5.0",
         "numpy>=1.21.0",
         "urllib3>=1.26.0",
+        "aiohttp>=3.8.0",
     ]
 
+# Optionally compile the per-message guardrails with mypyc (needs mypy and a
+# C compiler): MISTRAL_AUDIO_MYPYC=1 pip install .
+ext_modules = []
+if os.environ.get("MISTRAL_AUDIO_MYPYC") == "1":
+    from mypyc.build import mypycify
+    ext_modules = mypycify(["--ignore-missing-imports", "src/utils/guardrails.py"])
+
 setup(
     name="mistral-audio-analysis",
     version="2.0.0",
@@ -35,6 +42,7 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=requirements,
+    ext_modules=ext_modules,
     extras_require={
         "dev": [
             "pytest>=7.0.0",
@@ -46,13 +54,23 @@ setup(
         "audio": [
             "soundfile>=0.10.0",
             "ffmpeg-python>=0.2.0",
-        ]
-    },
-    entry_points={
-        "console_scripts": [
-            "mistral-audio=src.cli.main:main",
         ],
+        "cache": [
+            "diskcache>=5.4.0",
+        ],
+        "speedups": [
+            "orjson>=3.6.0",
+        ],
+        "http2": [
+            "httpx[http2]>=0.23.0",
+        ],
+        "hyperscan": [
+            "hyperscan>=0.4.0",
+        ]
     },
+    # Plain script instead of a console_scripts entry point: the generated
+    # entry point wrapper can import pkg_resources on every invocation
+    scripts=["bin/mistral-audio"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -3,31 +3,64 @@
 import os
 import sys
 import argparse
-import logging
-from pathlib import Path
+import importlib.util
 from typing import Optional
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
-
-from src.services import AudioAnalysisService, ChatService
 from src.config import get_settings
 
 
+def _lazy_import(name: str):
+    """Import a module whose body only runs on first attribute access"""
+    if name in sys.modules:
+        return sys.modules[name]
+    
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# The service layer pulls in the HTTP client and audio stack, so defer it
+# until a command actually needs it
+services = _lazy_import('src.services')
+
+
+# Logging is configured lazily by _ensure_logging() once a command runs
+_verbose_logging = False
+_logging_configured = False
+
+
 def setup_logging(verbose: bool = False):
-    """Setup logging configuration"""
-    level = logging.DEBUG if verbose else logging.INFO
+    """Record the logging configuration; handlers are installed on first use"""
+    global _verbose_logging
+    _verbose_logging = verbose
+
+
+def _ensure_logging():
+    """Install the logging configuration recorded by setup_logging"""
+    global _logging_configured
+    if _logging_configured:
+        return
+    
+    import logging
+    
+    level = logging.DEBUG if _verbose_logging else logging.INFO
     logging.basicConfig(
         level=level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    _logging_configured = True
 
 
 def analyze_audio_file(file_path: str, custom_question: Optional[str] = None):
     """Analyze a single audio file"""
+    _ensure_logging()
     try:
-        analysis_service = AudioAnalysisService()
+        analysis_service = services.AudioAnalysisService()
         
         print(f"\\nAnalyzing audio file: {file_path}")
         print("-" * 50)
@@ -38,12 +71,12 @@ def analyze_audio_file(file_path: str, custom_question: Optional[str] = None):
             include_features=True
         )
         
-        if result['success']:
+        if result.success:
             print(f"✅ Analysis completed successfully!")
-            print(f"📊 Spectrogram saved to: {result['audio_analysis']['spectrogram_path']}")
+            print(f"📊 Spectrogram saved to: {result.spectrogram_path}")
             
             # Display audio features
-            features = result['audio_analysis']['features']
+            features = result.features
             if features:
                 print(f"\\n🎵 Audio Features:")
                 print(f"   Duration: {features.get('duration', 'N/A'):.2f} seconds")
@@ -53,13 +86,13 @@ def analyze_audio_file(file_path: str, custom_question: Optional[str] = None):
                 print(f"   Spectral Centroid: {features.get('spectral_centroid', 'N/A'):.1f} Hz")
             
             # Display AI explanation
-            if result['ai_explanation']['success']:
+            if result.ai_success:
                 print(f"\\n🤖 AI Explanation:")
-                print(f"{result['ai_explanation']['content']}")
+                print(f"{result.ai_content}")
             else:
-                print(f"\\n❌ AI explanation failed: {result['ai_explanation']['error']}")
+                print(f"\\n❌ AI explanation failed: {result.ai_error}")
         else:
-            print(f"❌ Analysis failed: {result['error']}")
+            print(f"❌ Analysis failed: {result.error}")
     
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -67,8 +100,9 @@ def analyze_audio_file(file_path: str, custom_question: Optional[str] = None):
 
 def interactive_chat():
     """Start interactive chat mode"""
+    _ensure_logging()
     try:
-        chat_service = ChatService()
+        chat_service = services.ChatService()
         
         # Start conversation
         start_result = chat_service.start_conversation()
@@ -161,8 +195,9 @@ ANALYSIS WORKFLOW:
 
 def health_check():
     """Perform system health check"""
+    _ensure_logging()
     try:
-        analysis_service = AudioAnalysisService()
+        analysis_service = services.AudioAnalysisService()
         
         print("\\n🔍 System Health Check")
         print("-" * 30)
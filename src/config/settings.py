@@ -1,77 +1,207 @@
 """Configuration settings for MistralAI application"""
 
 import os
-from typing import Optional
-from pydantic import BaseSettings, Field, validator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
 
 
-class Settings(BaseSettings):
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment value"""
+    normalized = value.strip().lower()
+    if normalized in {"1", "true", "t", "yes", "y", "on"}:
+        return True
+    if normalized in {"0", "false", "f", "no", "n", "off"}:
+        return False
+    raise ValueError(f"invalid boolean value: {value!r}")
+
+
+def _parse_optional_int(value: str) -> Optional[int]:
+    """Parse an integer environment value, treating an empty value as unset"""
+    return int(value) if value.strip() else None
+
+
+def _parse_optional_str(value: str) -> Optional[str]:
+    """Parse a string environment value, treating an empty value as unset"""
+    return value.strip() or None
+
+
+# (field name, environment variable, parser)
+_ENV_FIELDS: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ("mistral_api_key", "MISTRAL_API_KEY", str),
+    ("mistral_model", "MISTRAL_MODEL", str),
+    ("mistral_api_url", "MISTRAL_API_URL", str),
+    ("mistral_models_url", "MISTRAL_MODELS_URL", _parse_optional_str),
+    ("audio_sample_rate", "AUDIO_SAMPLE_RATE", _parse_optional_int),
+    ("max_audio_duration", "MAX_AUDIO_DURATION", int),
+    ("decoded_audio_cache_size", "DECODED_AUDIO_CACHE_SIZE", int),
+    ("output_directory", "OUTPUT_DIR", str),
+    ("temp_directory", "TEMP_DIR", str),
+    ("max_tokens", "MAX_TOKENS", int),
+    ("temperature", "TEMPERATURE", float),
+    ("max_retries", "MAX_RETRIES", int),
+    ("request_timeout", "REQUEST_TIMEOUT", int),
+    ("health_check_ttl", "HEALTH_CHECK_TTL", int),
+    ("http_pool_maxsize", "HTTP_POOL_MAXSIZE", int),
+    ("enable_http2", "ENABLE_HTTP2", _parse_bool),
+    ("max_concurrency", "MAX_CONCURRENCY", int),
+    ("max_workers", "MAX_WORKERS", _parse_optional_int),
+    ("enable_batching", "ENABLE_BATCHING", _parse_bool),
+    ("prompt_cache_key", "PROMPT_CACHE_KEY", _parse_optional_str),
+    ("enable_response_cache", "ENABLE_RESPONSE_CACHE", _parse_bool),
+    ("response_cache_size", "RESPONSE_CACHE_SIZE", int),
+    ("response_cache_dir", "RESPONSE_CACHE_DIR", _parse_optional_str),
+    ("chat_cache_size", "CHAT_CACHE_SIZE", int),
+    ("allowed_file_size_mb", "MAX_FILE_SIZE_MB", int),
+    ("enable_content_filter", "ENABLE_CONTENT_FILTER", _parse_bool),
+)
+
+
+def _load_env_file(path: str) -> Dict[str, str]:
+    """
+    Read KEY=VALUE pairs from a .env file
+    
+    Supports comments, blank lines, an optional ``export`` prefix, quoted
+    values and trailing `` # comments`` on unquoted values.
+    
+    Args:
+        path: Path to the .env file
+    
+    Returns:
+        Dictionary of variables keyed by upper-cased name (empty if the
+        file does not exist)
+    """
+    values: Dict[str, str] = {}
+    if not os.path.isfile(path):
+        return values
+    
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("export "):
+                line = line[len("export "):]
+            
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            
+            value = value.strip()
+            if value[:1] in ("'", '"') and value[-1:] == value[:1] and len(value) >= 2:
+                value = value[1:-1]
+            else:
+                value = value.split(" #", 1)[0].rstrip()
+            
+            values[key.strip().upper()] = value
+    
+    return values
+
+
+@dataclass
+class Settings:
     """Application settings with environment variable support"""
     
     # Mistral AI Configuration
-    mistral_api_key: str = Field(..., env="MISTRAL_API_KEY")
-    mistral_model: str = Field(default="mistral-small", env="MISTRAL_MODEL")
-    mistral_api_url: str = Field(
-        default="https://api.mistral.ai/v1/chat/completions",
-        env="MISTRAL_API_URL"
-    )
+    mistral_api_key: str = ""
+    mistral_model: str = "mistral-small"
+    mistral_api_url: str = "https://api.mistral.ai/v1/chat/completions"
+    mistral_models_url: Optional[str] = None  # defaults to the models endpoint beside mistral_api_url
     
     # Audio Processing Configuration
-    audio_sample_rate: Optional[int] = Field(default=None, env="AUDIO_SAMPLE_RATE")
-    max_audio_duration: int = Field(default=300, env="MAX_AUDIO_DURATION")  # seconds
-    supported_formats: list = Field(default=[".mp3", ".wav", ".flac", ".m4a"])
+    audio_sample_rate: Optional[int] = None
+    max_audio_duration: int = 300  # seconds
+    decoded_audio_cache_size: int = 8  # decoded files kept in memory (0 disables)
+    supported_formats: FrozenSet[str] = frozenset({".mp3", ".wav", ".flac", ".m4a"})
     
     # Output Configuration
-    output_directory: str = Field(default="./output", env="OUTPUT_DIR")
-    temp_directory: str = Field(default="./temp", env="TEMP_DIR")
+    output_directory: str = "./output"
+    temp_directory: str = "./temp"
     
     # LLM Guardrails Configuration
-    max_tokens: int = Field(default=1000, env="MAX_TOKENS")
-    temperature: float = Field(default=0.7, env="TEMPERATURE")
-    max_retries: int = Field(default=3, env="MAX_RETRIES")
-    request_timeout: int = Field(default=30, env="REQUEST_TIMEOUT")
+    max_tokens: int = 1000
+    temperature: float = 0.7
+    max_retries: int = 3
+    request_timeout: int = 30
+    health_check_ttl: int = 30  # seconds a successful API health check is reused
+    http_pool_maxsize: int = 32  # pooled connections kept to the API host
+    enable_http2: bool = False  # multiplex async requests over HTTP/2 (requires httpx[http2])
+    max_concurrency: int = 8  # in-flight API requests during batch analysis
+    max_workers: Optional[int] = None  # audio decode threads during batch analysis (None: CPU-based default)
+    enable_batching: bool = False  # combine concurrent questions into one request
+    prompt_cache_key: Optional[str] = None  # sent as prompt_cache_key to route requests to a warm prefix cache
+    
+    # Response Cache Configuration (only low-temperature requests are cached)
+    enable_response_cache: bool = True
+    response_cache_size: int = 256
+    response_cache_dir: Optional[str] = None  # persist entries with diskcache
+    chat_cache_size: int = 128  # chat replies reused for identical conversation state (0 disables)
     
     # Security Configuration
-    allowed_file_size_mb: int = Field(default=50, env="MAX_FILE_SIZE_MB")
-    enable_content_filter: bool = Field(default=True, env="ENABLE_CONTENT_FILTER")
+    allowed_file_size_mb: int = 50
+    enable_content_filter: bool = True
+    
+    def __post_init__(self):
+        # Extension checks are membership tests, so keep formats as a frozenset
+        self.supported_formats = frozenset(self.supported_formats)
+        self.validate_api_key()
+        self.validate_temperature()
+        self.validate_max_tokens()
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    @classmethod
+    def from_env(cls, env_file: str = ".env") -> "Settings":
+        """
+        Build settings from environment variables and an optional .env file
+        
+        Environment variables take precedence over values in the .env file.
+        Variable names are matched case-insensitively, as pydantic-settings did.
+        
+        Args:
+            env_file: Path to the .env file
+        
+        Returns:
+            Validated settings instance
+        
+        Raises:
+            ValueError: If a value cannot be parsed or fails validation
+        """
+        file_values = _load_env_file(env_file)
+        env_values = {key.upper(): value for key, value in os.environ.items()}
+        kwargs: Dict[str, Any] = {}
+        
+        for name, env_name, parse in _ENV_FIELDS:
+            raw = env_values.get(env_name, file_values.get(env_name))
+            if raw is None:
+                continue
+            try:
+                kwargs[name] = parse(raw)
+            except ValueError as e:
+                raise ValueError(f"Invalid value for {env_name}: {str(e)}") from e
+        
+        return cls(**kwargs)
     
-    @validator("mistral_api_key")
-    def validate_api_key(cls, v):
-        if not v or len(v) < 10:
+    def validate_api_key(self):
+        if not self.mistral_api_key or len(self.mistral_api_key) < 10:
             raise ValueError("MISTRAL_API_KEY must be provided and valid")
-        return v
     
-    @validator("temperature")
-    def validate_temperature(cls, v):
-        if not 0.0 <= v <= 2.0:
+    def validate_temperature(self):
+        if not 0.0 <= self.temperature <= 2.0:
             raise ValueError("Temperature must be between 0.0 and 2.0")
-        return v
     
-    @validator("max_tokens")
-    def validate_max_tokens(cls, v):
-        if v <= 0 or v > 4000:
+    def validate_max_tokens(self):
+        if self.max_tokens <= 0 or self.max_tokens > 4000:
             raise ValueError("Max tokens must be between 1 and 4000")
-        return v
     
     def create_directories(self):
         """Create necessary directories if they don't exist"""
         for directory in [self.output_directory, self.temp_directory]:
-            os.makedirs(directory, exist_ok=True)
-
-
-# Global settings instance
-_settings: Optional[Settings] = None
+            if not os.path.isdir(directory):
+                os.makedirs(directory, exist_ok=True)
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get the application settings singleton"""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-        _settings.create_directories()
-    return _settings
+    settings = Settings.from_env(os.environ.get("ENV_FILE", ".env"))
+    settings.create_directories()
+    return settings
@@ -1,6 +1,13 @@
 """Core functionality for MistralAI"""
 
-from .audio_processor import AudioProcessor
-from .llm_client import MistralClient
+from .audio_processor import AudioProcessor, get_audio_processor
+from .llm_client import MistralClient, MistralAsyncClient, BatchedMistralClient, get_mistral_client
 
-__all__ = ["AudioProcessor", "MistralClient"]
+__all__ = [
+    "AudioProcessor",
+    "MistralClient",
+    "MistralAsyncClient",
+    "BatchedMistralClient",
+    "get_audio_processor",
+    "get_mistral_client",
+]
@@ -1,26 +1,61 @@
 """Audio processing functionality"""
 
+from __future__ import annotations
+
 import os
 import logging
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, Optional, Dict, Any
-
-import librosa
-import librosa.display
-import matplotlib.pyplot as plt
-import numpy as np
+from typing import TYPE_CHECKING, Tuple, Optional, Dict, Any
 
 from ..config import get_settings
 from ..utils.validators import validate_audio_file
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# STFT parameters shared by every spectral feature and the mel spectrogram
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# Mel spectrogram parameters
+N_MELS = 128
+MEL_FMAX = 8000
+
+# Formats libsndfile decodes natively, so librosa's loader can be bypassed
+SOUNDFILE_FORMATS = frozenset({".wav", ".flac"})
+
+
+def _as_float32(signal: np.ndarray) -> np.ndarray:
+    """Return the signal as contiguous float32, copying only if needed"""
+    import numpy as np
+    
+    return np.ascontiguousarray(signal, dtype=np.float32)
+
 
 class AudioProcessor:
     """Handles audio file processing and spectrogram generation"""
     
     def __init__(self):
         self.settings = get_settings()
+        
+        # Spectrogram figure, created on first use and reused across renders
+        self._fig = None
+        self._ax = None
+        self._cbar = None
+        self._plot_lock = threading.Lock()
+        
+        # Mel filterbanks keyed by (sample rate, fmax)
+        self._mel_basis: Dict[Tuple[int, Optional[float]], np.ndarray] = {}
+        
+        # Decoded signals keyed by (path, mtime, size, sample rate), so helpers
+        # working on the same unchanged file decode it only once
+        self._decode_audio = lru_cache(maxsize=self.settings.decoded_audio_cache_size)(
+            self._read_audio
+        )
     
     def load_audio_file(self, file_path: str) -> Tuple[np.ndarray, int]:
         """
@@ -38,14 +73,14 @@ class AudioProcessor:
             Exception: If file cannot be loaded
         """
         try:
-            # Validate file
-            validate_audio_file(file_path, self.settings)
+            # Validate file; its stat result also keys the decode cache
+            file_stat = validate_audio_file(file_path, self.settings)
             
-            # Load audio with librosa
-            signal, sample_rate = librosa.load(
-                file_path, 
-                sr=self.settings.audio_sample_rate,
-                duration=self.settings.max_audio_duration
+            signal, sample_rate = self._decode_audio(
+                os.path.abspath(file_path),
+                file_stat.st_mtime_ns,
+                file_stat.st_size,
+                self.settings.audio_sample_rate
             )
             
             logger.info(f"Successfully loaded audio file: {file_path}")
@@ -60,11 +95,103 @@ class AudioProcessor:
             logger.error(f"Error loading audio file {file_path}: {str(e)}")
             raise
     
+    def _read_audio(
+        self,
+        file_path: str,
+        mtime_ns: int,
+        size: int,
+        sample_rate: Optional[int]
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Decode an audio file (memoized as _decode_audio)
+        
+        The modification time and size are only part of the cache key, so an
+        edited file is decoded again. The returned signal is read-only
+        because it is shared between callers.
+        """
+        loaded = self._load_with_soundfile(file_path, sample_rate)
+        if loaded is not None:
+            signal, file_sample_rate = loaded
+        else:
+            import librosa
+            
+            # Load audio with librosa
+            signal, file_sample_rate = librosa.load(
+                file_path, 
+                sr=sample_rate,
+                duration=self.settings.max_audio_duration
+            )
+        
+        # Keep the whole pipeline in contiguous float32
+        signal = _as_float32(signal)
+        signal.flags.writeable = False
+        
+        return signal, file_sample_rate
+    
+    def _load_with_soundfile(
+        self,
+        file_path: str,
+        sample_rate: Optional[int]
+    ) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Read WAV/FLAC files directly with soundfile
+        
+        Only used when no resampling is requested. Returns None when the
+        fast path does not apply so the caller can fall back to librosa.
+        """
+        if sample_rate is not None:
+            return None
+        if Path(file_path).suffix.lower() not in SOUNDFILE_FORMATS:
+            return None
+        
+        import soundfile as sf
+        
+        try:
+            with sf.SoundFile(file_path) as audio_file:
+                sample_rate = audio_file.samplerate
+                frames = -1
+                if self.settings.max_audio_duration:
+                    frames = int(sample_rate * self.settings.max_audio_duration)
+                signal = audio_file.read(frames, dtype='float32', always_2d=False)
+        except RuntimeError as e:
+            logger.debug(f"soundfile could not read {file_path}, falling back to librosa: {str(e)}")
+            return None
+        
+        # Downmix to mono the same way librosa does
+        if signal.ndim == 2:
+            signal = signal.mean(axis=1)
+        
+        return signal, sample_rate
+    
+    def compute_stft_magnitude(self, signal: np.ndarray) -> np.ndarray:
+        """
+        Compute the magnitude STFT of a signal
+        
+        The result can be passed as ``S`` to ``extract_audio_features`` and
+        ``generate_spectrogram`` so the transform is only computed once.
+        
+        Args:
+            signal: Audio signal array
+            
+        Returns:
+            Magnitude spectrogram of shape (1 + N_FFT // 2, frames)
+        """
+        import librosa
+        import numpy as np
+        
+        return np.abs(librosa.stft(
+            _as_float32(signal),
+            n_fft=N_FFT,
+            hop_length=HOP_LENGTH,
+            dtype=np.complex64
+        ))
+    
     def generate_spectrogram(
         self, 
         signal: np.ndarray, 
         sample_rate: int,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        S: Optional[np.ndarray] = None
     ) -> str:
         """
         Generate and save a spectrogram from audio signal
@@ -73,44 +200,26 @@ class AudioProcessor:
             signal: Audio signal array
             sample_rate: Sample rate of the audio
             output_path: Optional custom output path
+            S: Optional precomputed magnitude STFT (see compute_stft_magnitude)
             
         Returns:
             Path to the generated spectrogram image
         """
+        import librosa
+        import librosa.display
+        import numpy as np
+        from matplotlib.ticker import FormatStrFormatter
+
         try:
-            # Set up matplotlib for non-interactive backend
-            plt.switch_backend('Agg')
-            
-            # Create figure
-            plt.figure(figsize=(12, 6))
+            if S is None:
+                S = self.compute_stft_magnitude(signal)
             
-            # Generate mel spectrogram
-            spectrogram = librosa.feature.melspectrogram(
-                y=signal, 
-                sr=sample_rate,
-                n_mels=128,
-                fmax=8000
-            )
+            # Generate mel spectrogram from the power spectrum
+            spectrogram = self._get_mel_basis(sample_rate) @ (S**2)
             
             # Convert to dB scale
             spectrogram_db = librosa.power_to_db(spectrogram, ref=np.max)
             
-            # Display spectrogram
-            librosa.display.specshow(
-                spectrogram_db,
-                sr=sample_rate,
-                x_axis='time',
-                y_axis='mel',
-                fmax=8000
-            )
-            
-            # Customize plot
-            plt.colorbar(format='%+2.0f dB')
-            plt.title('Mel Spectrogram')
-            plt.xlabel('Time (s)')
-            plt.ylabel('Frequency (Hz)')
-            plt.tight_layout()
-            
             # Determine output path
             if output_path is None:
                 output_path = os.path.join(
@@ -118,45 +227,115 @@ class AudioProcessor:
                     "spectrogram.png"
                 )
             
-            # Save the figure
-            plt.savefig(output_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            with self._plot_lock:
+                fig, ax = self._get_figure()
+                ax.cla()
+                
+                # Display spectrogram
+                mesh = librosa.display.specshow(
+                    spectrogram_db,
+                    sr=sample_rate,
+                    x_axis='time',
+                    y_axis='mel',
+                    fmax=MEL_FMAX,
+                    ax=ax
+                )
+                
+                # Customize plot
+                if self._cbar is None:
+                    self._cbar = fig.colorbar(mesh, ax=ax, format='%+2.0f dB')
+                else:
+                    # update_normal resets the formatter when the norm changes
+                    self._cbar.update_normal(mesh)
+                    self._cbar.formatter = FormatStrFormatter('%+2.0f dB')
+                ax.set_title('Mel Spectrogram')
+                ax.set_xlabel('Time (s)')
+                ax.set_ylabel('Frequency (Hz)')
+                
+                # Save the figure (layout is fixed when the figure is created)
+                fig.savefig(output_path, dpi=150)
             
             logger.info(f"Spectrogram saved to: {output_path}")
             return output_path
             
         except Exception as e:
             logger.error(f"Error generating spectrogram: {str(e)}")
-            plt.close()  # Ensure we clean up on error
             raise
     
-    def extract_audio_features(self, signal: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+    def _get_mel_basis(self, sample_rate: int, fmax: Optional[float] = MEL_FMAX) -> np.ndarray:
+        """Get the mel filterbank for a sample rate, building it on first use"""
+        key = (sample_rate, fmax)
+        mel_basis = self._mel_basis.get(key)
+        if mel_basis is None:
+            import librosa
+            
+            mel_basis = librosa.filters.mel(
+                sr=sample_rate,
+                n_fft=N_FFT,
+                n_mels=N_MELS,
+                fmax=fmax
+            )
+            self._mel_basis[key] = mel_basis
+        return mel_basis
+    
+    def _get_figure(self):
+        """Create the reusable spectrogram figure on first use"""
+        if self._fig is None:
+            # A bare Figure renders through Agg without touching pyplot's
+            # global state or switching the process-wide backend
+            from matplotlib.figure import Figure
+            
+            self._fig = Figure(figsize=(12, 6))
+            self._fig.subplots_adjust(left=0.07, right=0.96, top=0.94, bottom=0.1)
+            self._ax = self._fig.add_subplot()
+        return self._fig, self._ax
+    
+    def extract_audio_features(
+        self, 
+        signal: np.ndarray, 
+        sample_rate: int,
+        S: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
         """
         Extract various audio features from the signal
         
         Args:
             signal: Audio signal array
             sample_rate: Sample rate of the audio
+            S: Optional precomputed magnitude STFT (see compute_stft_magnitude)
             
         Returns:
             Dictionary containing extracted features
         """
+        import librosa
+        import numpy as np
+
         try:
+            signal = _as_float32(signal)
             features = {}
             
             # Basic features
             features['duration'] = len(signal) / sample_rate
             features['sample_rate'] = sample_rate
-            features['rms_energy'] = np.sqrt(np.mean(signal**2))
+            # dot() avoids materialising a squared copy of the signal
+            features['rms_energy'] = float(np.sqrt(signal.dot(signal) / signal.size))
             
-            # Spectral features
-            features['spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(y=signal, sr=sample_rate))
-            features['spectral_bandwidth'] = np.mean(librosa.feature.spectral_bandwidth(y=signal, sr=sample_rate))
-            features['spectral_rolloff'] = np.mean(librosa.feature.spectral_rolloff(y=signal, sr=sample_rate))
-            features['zero_crossing_rate'] = np.mean(librosa.feature.zero_crossing_rate(signal))
+            # Spectral features (all derived from a single STFT)
+            if S is None:
+                S = self.compute_stft_magnitude(signal)
+            features['spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(S=S, sr=sample_rate))
+            features['spectral_bandwidth'] = np.mean(librosa.feature.spectral_bandwidth(S=S, sr=sample_rate))
+            features['spectral_rolloff'] = np.mean(librosa.feature.spectral_rolloff(S=S, sr=sample_rate))
             
-            # MFCC features (first 13 coefficients)
-            mfcc = librosa.feature.mfcc(y=signal, sr=sample_rate, n_mfcc=13)
+            # Global zero-crossing rate: fraction of adjacent samples whose sign differs
+            sign = np.signbit(signal)
+            crossings = np.count_nonzero(sign[1:] != sign[:-1])
+            features['zero_crossing_rate'] = float(crossings / (signal.size - 1)) if signal.size > 1 else 0.0
+            
+            # MFCC features (first 13 coefficients), as a DCT of the full-band
+            # log-mel spectrum built from the shared STFT
+            mel = self._get_mel_basis(sample_rate, fmax=None) @ (S**2)
+            mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=13)
             features['mfcc_mean'] = np.mean(mfcc, axis=1).tolist()
             features['mfcc_std'] = np.std(mfcc, axis=1).tolist()
             
@@ -185,11 +364,14 @@ class AudioProcessor:
             # Load audio
             signal, sample_rate = self.load_audio_file(file_path)
             
+            # Compute the STFT once and share it between features and spectrogram
+            S = self.compute_stft_magnitude(signal)
+            
             # Extract features
-            features = self.extract_audio_features(signal, sample_rate)
+            features = self.extract_audio_features(signal, sample_rate, S=S)
             
             # Generate spectrogram
-            spectrogram_path = self.generate_spectrogram(signal, sample_rate)
+            spectrogram_path = self.generate_spectrogram(signal, sample_rate, S=S)
             
             # Compile results
             analysis_result = {
@@ -209,3 +391,9 @@ class AudioProcessor:
                 'error': str(e),
                 'success': False
             }
+
+
+@lru_cache(maxsize=1)
+def get_audio_processor() -> AudioProcessor:
+    """Get the shared audio processor so its figure and mel filterbanks are reused"""
+    return AudioProcessor()
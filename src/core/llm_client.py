@@ -1,84 +1,393 @@
 """Mistral AI client with guardrails and error handling"""
 
+import asyncio
+import json
 import logging
+import re
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
+from urllib.parse import urljoin, urlsplit
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from ..config import get_settings
+from ..utils import json_codec
+from ..utils.formatting import format_audio_features
 from ..utils.guardrails import ContentFilter
+from ..utils.response_cache import ResponseCache, get_response_cache
 
 logger = logging.getLogger(__name__)
 
+# Status codes retried by both the sync and async clients
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
-class MistralClient:
-    """Mistral AI client with built-in guardrails and error handling"""
+# Longest Retry-After delay the async client will sleep for before retrying
+MAX_RETRY_AFTER = 60
+
+# Health checks only list models, so they should answer quickly
+HEALTH_CHECK_TIMEOUT = 5
+
+# Batch API job statuses after which a job no longer changes
+BATCH_FINAL_STATUSES = frozenset({"SUCCESS", "FAILED", "TIMEOUT_EXCEEDED", "CANCELLED"})
+
+# Responses are only cached when sampling is close to deterministic
+CACHEABLE_MAX_TEMPERATURE = 0.2
+
+# The async client filters content of at least this many characters on
+# _FILTER_POOL so long chat contexts do not stall the event loop; shorter
+# content is cheaper to filter than to hand off to a thread
+OFFLOAD_FILTER_MIN_CHARS = 2000
+_FILTER_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="content-filter")
+
+# Streamed text is filtered and released one sentence at a time
+SENTENCE_BOUNDARY = re.compile(r"[.!?\n]\s")
+
+# Invariant instructions for spectrogram explanations. Sent as the leading
+# system message so every request shares a byte-identical prompt prefix that
+# provider-side prompt/KV caches can reuse; only the audio context varies.
+SPECTROGRAM_EXPLANATION_PROMPT = (
+    "Please explain what a spectrogram shows in audio analysis.\n"
+    "Focus on:\n"
+    "1. What the visual representation means\n"
+    "2. How frequency and time are displayed\n"
+    "3. What different colors/intensities represent\n"
+    "4. How this helps in understanding audio characteristics\n"
+    "\n"
+    "Keep the explanation clear and accessible while being technically accurate."
+)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into a delay in seconds
+    
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+    
+    Returns:
+        Delay clamped to [0, MAX_RETRY_AFTER], or None if absent or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        delay = float(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            return None
+        delay = retry_at.timestamp() - time.time()
+    
+    return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+
+class _MistralClientBase:
+    """Request building, guardrails and response handling shared by the clients"""
     
     def __init__(self):
         self.settings = get_settings()
         self.content_filter = ContentFilter() if self.settings.enable_content_filter else None
-        self.session = self._create_session()
-    
-    def _create_session(self) -> requests.Session:
-        """Create a requests session with retry strategy"""
-        session = requests.Session()
-        
-        # Define retry strategy
-        retry_strategy = Retry(
-            total=self.settings.max_retries,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            method_whitelist=["HEAD", "GET", "POST"]
+        self.response_cache: Optional[ResponseCache] = (
+            get_response_cache() if self.settings.enable_response_cache else None
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        return session
-    
-    def _prepare_headers(self) -> Dict[str, str]:
-        """Prepare headers for Mistral API requests"""
-        return {
+        # Request pieces that never change, built once instead of per request.
+        # The headers are installed on the HTTP session as its defaults.
+        self.headers = {
             "Authorization": f"Bearer {self.settings.mistral_api_key}",
             "Content-Type": "application/json",
             "User-Agent": "MistralAI-AudioAnalysis/2.0.0"
         }
+        self._model = self.settings.mistral_model
+        self._default_temperature = self.settings.temperature
+        self._default_max_tokens = self.settings.max_tokens
+        self._prompt_cache_key = self.settings.prompt_cache_key
     
     def _prepare_payload(
-        self, 
-        messages: List[Dict[str, str]], 
+        self,
+        messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """Prepare the payload for Mistral API requests"""
-        return {
-            "model": self.settings.mistral_model,
+        # The chat completions endpoint rejects cache_control, a prompt cache
+        # hint some other providers accept on messages
+        if any("cache_control" in message for message in messages):
+            messages = [
+                {key: value for key, value in message.items() if key != "cache_control"}
+                for message in messages
+            ]
+        
+        payload = {
+            "model": self._model,
             "messages": messages,
-            "temperature": temperature or self.settings.temperature,
-            "max_tokens": max_tokens or self.settings.max_tokens,
+            "temperature": temperature if temperature is not None else self._default_temperature,
+            "max_tokens": max_tokens or self._default_max_tokens,
             "safe_prompt": True  # Enable Mistral's built-in safety
         }
+        if self._prompt_cache_key:
+            payload["prompt_cache_key"] = self._prompt_cache_key
+        return payload
+    
+    @staticmethod
+    def _inflight_key(
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int]
+    ) -> str:
+        """Identify a chat completion request for coalescing duplicates in flight"""
+        return ResponseCache.make_key({
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+    
+    def _response_cache_key(self, payload: Dict[str, Any], bypass_cache: bool) -> Optional[str]:
+        """Return the response cache key for a payload, or None if it is not cacheable"""
+        if bypass_cache or self.response_cache is None:
+            return None
+        if payload["temperature"] > CACHEABLE_MAX_TEMPERATURE:
+            return None
+        return self.response_cache.make_key(payload)
+    
+    def _get_cached_response(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Look up a previously cached result"""
+        if cache_key is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached Mistral API response")
+            cached['cached'] = True
+        return cached
+    
+    def _store_cached_response(self, cache_key: Optional[str], result: Dict[str, Any]):
+        """Cache a result if it is cacheable and successful"""
+        if cache_key is not None and result['success']:
+            self.response_cache.set(cache_key, result)
     
     def _validate_and_filter_content(self, content: str) -> str:
         """Validate and filter content using guardrails"""
+        if not self.content_filter or not content or content.isspace():
+            return content
+        
+        filtered = self.content_filter.check_and_filter(content)
+        if filtered is None:
+            raise ValueError("Content failed safety checks")
+        
+        return filtered
+    
+    def _filter_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Run every message's content through the guardrails
+        
+        Returns new message dicts; the caller's messages are left untouched.
+        """
+        return [
+            {**message, 'content': self._validate_and_filter_content(message['content'])}
+            if 'content' in message else message
+            for message in messages
+        ]
+    
+    def _handle_success_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and filter the content of a successful API response"""
+        if 'choices' in result and len(result['choices']) > 0:
+            content = result['choices'][0]['message']['content']
+            
+            # Filter response content
+            if self.content_filter:
+                content = self.content_filter.filter_content(content)
+                result['choices'][0]['message']['content'] = content
+            
+            logger.info("Successfully received response from Mistral API")
+            return {
+                'success': True,
+                'response': result,
+                'content': content,
+                'usage': result.get('usage', {}),
+                'model': result.get('model', self.settings.mistral_model)
+            }
+        
+        logger.error("Invalid response format from Mistral API")
+        return {
+            'success': False,
+            'error': "Invalid response format",
+            'response': result
+        }
+    
+    def _handle_error_status(self, status_code: int, text: str) -> Dict[str, Any]:
+        """Build the result for a non-200 API response"""
+        error_msg = f"API request failed: {status_code} - {text}"
+        logger.error(error_msg)
+        return {
+            'success': False,
+            'error': error_msg,
+            'status_code': status_code
+        }
+    
+    def _error_result(self, error_msg: str) -> Dict[str, Any]:
+        """Log and build a failed result"""
+        logger.error(error_msg)
+        return {
+            'success': False,
+            'error': error_msg
+        }
+    
+    @staticmethod
+    def _parse_sse_line(line: str) -> Optional[str]:
+        """Extract the content delta from one server-sent event line"""
+        if not line.startswith("data:"):
+            return None
+        
+        data = line[len("data:"):].strip()
+        if not data or data == "[DONE]":
+            return None
+        
+        choices = json_codec.loads(data).get('choices')
+        if not choices:
+            return None
+        return choices[0].get('delta', {}).get('content') or None
+    
+    def _take_complete_sentences(self, buffer: str) -> Tuple[str, str]:
+        """
+        Split streamed text into filtered complete sentences and the remainder
+        
+        Holding back the unfinished sentence keeps an e-mail address, phone
+        number or URL in one piece so the guardrails can still redact it.
+        """
+        end = 0
+        for match in SENTENCE_BOUNDARY.finditer(buffer):
+            end = match.end()
+        if not end:
+            return "", buffer
+        return self._filter_stream_segment(buffer[:end]), buffer[end:]
+    
+    def _filter_stream_segment(self, segment: str) -> str:
+        """Apply the guardrails to a piece of streamed text"""
         if self.content_filter:
-            # Check for inappropriate content
-            if not self.content_filter.is_safe_content(content):
-                raise ValueError("Content failed safety checks")
+            return self.content_filter.filter_partial_content(segment)
+        return segment
+    
+    @staticmethod
+    def _question_messages(question: str, context: Optional[str] = None) -> List[Dict[str, str]]:
+        """Build the message list for a single question"""
+        messages = []
+        
+        if context:
+            messages.append({
+                "role": "system",
+                "content": f"Context: {context}"
+            })
+        
+        messages.append({
+            "role": "user",
+            "content": question
+        })
+        
+        return messages
+    
+    def _spectrogram_messages(
+        self,
+        audio_features: Optional[Dict[str, Any]] = None,
+        custom_context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the messages for a spectrogram explanation"""
+        context = self._spectrogram_context(audio_features, custom_context)
+        
+        return [
+            {"role": "system", "content": SPECTROGRAM_EXPLANATION_PROMPT},
+            {
+                "role": "user",
+                "content": context or "Please explain what a spectrogram shows."
+            }
+        ]
+    
+    @staticmethod
+    def _spectrogram_context(
+        audio_features: Optional[Dict[str, Any]] = None,
+        custom_context: Optional[str] = None
+    ) -> Optional[str]:
+        """Build the variable audio context for a spectrogram explanation"""
+        # Add audio features context if available
+        if audio_features:
+            context = format_audio_features(audio_features, "Audio Analysis Context:")
             
-            # Filter content if needed
-            content = self.content_filter.filter_content(content)
+            if custom_context:
+                context += f"\n\nAdditional Context: {custom_context}"
         
-        return content
+        else:
+            context = custom_context
+        
+        return context
+
+
+class MistralClient(_MistralClientBase):
+    """Mistral AI client with built-in guardrails and error handling"""
+    
+    def __init__(self):
+        super().__init__()
+        self.session = self._create_session()
+        
+        # Identical requests currently in flight, keyed by _inflight_key, and
+        # the number of callers waiting on each
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_waiters: Dict[str, int] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # The models endpoint lives beside chat/completions unless configured
+        self.models_url = self.settings.mistral_models_url or urljoin(
+            self.settings.mistral_api_url, "../models"
+        )
+        self._last_healthy_at: Optional[float] = None
+        
+        # Batch API endpoints, also beside chat/completions
+        self.files_url = urljoin(self.settings.mistral_api_url, "../files")
+        self.batch_jobs_url = urljoin(self.settings.mistral_api_url, "../batch/jobs")
+    
+    def _create_session(self) -> requests.Session:
+        """Create a requests session with retry strategy"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        
+        # Define retry strategy
+        retry_strategy = Retry(
+            total=self.settings.max_retries,
+            backoff_factor=1,
+            status_forcelist=sorted(RETRY_STATUS_CODES),
+            allowed_methods=["HEAD", "GET", "POST"]
+        )
+        
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        
+        # Size the pool for the API host so concurrent requests reuse
+        # connections (and TLS sessions) instead of discarding them
+        api_url = urlsplit(self.settings.mistral_api_url)
+        api_adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.settings.http_pool_maxsize,
+            pool_block=False,
+            max_retries=retry_strategy
+        )
+        session.mount(f"{api_url.scheme}://{api_url.netloc}", api_adapter)
+        
+        return session
     
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        bypass_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Send a chat completion request to Mistral AI
@@ -87,87 +396,90 @@ class MistralClient:
             messages: List of message dictionaries with 'role' and 'content'
             temperature: Override default temperature
             max_tokens: Override default max tokens
-            
+            bypass_cache: Skip the response cache and in-flight request sharing
+        
         Returns:
             Dictionary containing the response and metadata
-            
-        Raises:
-            ValueError: If content fails safety checks
-            requests.RequestException: If API request fails
         """
+        if bypass_cache:
+            return self._chat_completion(messages, temperature, max_tokens, bypass_cache)
+        
+        # Concurrent identical requests share a single API call
+        key = self._inflight_key(messages, temperature, max_tokens)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[key] = Future()
+                self._inflight_waiters[key] = 0
+            else:
+                self._inflight_waiters[key] += 1
+        
+        if not is_leader:
+            logger.debug(f"Coalesced request {key[:12]} with an identical one in flight")
+            return dict(future.result())
+        
+        try:
+            result = self._chat_completion(messages, temperature, max_tokens, bypass_cache)
+        except BaseException as e:
+            # Only hand the exception to waiting callers: one nobody retrieves
+            # would keep this frame alive through the future
+            if self._end_inflight(key):
+                future.set_exception(e)
+            raise
+        
+        self._end_inflight(key)
+        future.set_result(result)
+        return result
+    
+    def _end_inflight(self, key: str) -> int:
+        """Stop sharing an in-flight request and return how many callers wait on it"""
+        with self._inflight_lock:
+            del self._inflight[key]
+            return self._inflight_waiters.pop(key)
+    
+    def _chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        bypass_cache: bool
+    ) -> Dict[str, Any]:
+        """Filter, send and cache a single chat completion request"""
         try:
             # Validate input messages
-            for message in messages:
-                if 'content' in message:
-                    message['content'] = self._validate_and_filter_content(message['content'])
+            messages = self._filter_messages(messages)
             
             # Prepare request
-            headers = self._prepare_headers()
             payload = self._prepare_payload(messages, temperature, max_tokens)
             
+            cache_key = self._response_cache_key(payload, bypass_cache)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
+            
             logger.info(f"Sending request to Mistral API with {len(messages)} messages")
             
             # Make request with timeout
             response = self.session.post(
                 self.settings.mistral_api_url,
-                headers=headers,
-                json=payload,
+                data=json_codec.dumps(payload),
                 timeout=self.settings.request_timeout
             )
             
             # Handle response
             if response.status_code == 200:
-                result = response.json()
-                
-                # Extract and validate response content
-                if 'choices' in result and len(result['choices']) > 0:
-                    content = result['choices'][0]['message']['content']
-                    
-                    # Filter response content
-                    if self.content_filter:
-                        content = self.content_filter.filter_content(content)
-                        result['choices'][0]['message']['content'] = content
-                    
-                    logger.info("Successfully received response from Mistral API")
-                    return {
-                        'success': True,
-                        'response': result,
-                        'content': content,
-                        'usage': result.get('usage', {}),
-                        'model': result.get('model', self.settings.mistral_model)
-                    }
-                else:
-                    logger.error("Invalid response format from Mistral API")
-                    return {
-                        'success': False,
-                        'error': "Invalid response format",
-                        'response': result
-                    }
+                result = self._handle_success_response(json_codec.loads(response.content))
+                self._store_cached_response(cache_key, result)
+                return result
             
-            else:
-                error_msg = f"API request failed: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                return {
-                    'success': False,
-                    'error': error_msg,
-                    'status_code': response.status_code
-                }
+            return self._handle_error_status(response.status_code, response.text)
         
         except requests.exceptions.Timeout:
-            error_msg = f"Request timeout after {self.settings.request_timeout} seconds"
-            logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg
-            }
+            return self._error_result(f"Request timeout after {self.settings.request_timeout} seconds")
         
         except requests.exceptions.RequestException as e:
-            error_msg = f"Request failed: {str(e)}"
-            logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg
-            }
+            return self._error_result(f"Request failed: {str(e)}")
         
         except ValueError as e:
             logger.error(f"Content validation failed: {str(e)}")
@@ -177,12 +489,63 @@ class MistralClient:
             }
         
         except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg
-            }
+            return self._error_result(f"Unexpected error: {str(e)}")
+    
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion from Mistral AI as it is generated
+        
+        Text is yielded a sentence at a time so the guardrails can redact
+        sensitive data before it reaches the caller.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+        
+        Yields:
+            Filtered pieces of the response text
+        
+        Raises:
+            ValueError: If content fails safety checks
+            requests.RequestException: If API request fails
+        """
+        messages = self._filter_messages(messages)
+        payload = self._prepare_payload(messages, temperature, max_tokens)
+        payload["stream"] = True
+        
+        logger.info(f"Streaming request to Mistral API with {len(messages)} messages")
+        
+        with self.session.post(
+            self.settings.mistral_api_url,
+            data=json_codec.dumps(payload),
+            timeout=self.settings.request_timeout,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                error = self._handle_error_status(response.status_code, response.text)
+                raise requests.HTTPError(error['error'], response=response)
+            
+            # text/event-stream has no charset, so requests would assume Latin-1
+            response.encoding = "utf-8"
+            
+            buffer = ""
+            for line in response.iter_lines(decode_unicode=True):
+                delta = self._parse_sse_line(line)
+                if delta is None:
+                    continue
+                
+                ready, buffer = self._take_complete_sentences(buffer + delta)
+                if ready:
+                    yield ready
+            
+            if buffer:
+                yield self._filter_stream_segment(buffer)
     
     def ask_question(self, question: str, context: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -191,27 +554,14 @@ class MistralClient:
         Args:
             question: The question to ask
             context: Optional context to provide
-            
+        
         Returns:
             Dictionary containing the response and metadata
         """
-        messages = []
-        
-        if context:
-            messages.append({
-                "role": "system",
-                "content": f"Context: {context}"
-            })
-        
-        messages.append({
-            "role": "user",
-            "content": question
-        })
-        
-        return self.chat_completion(messages)
+        return self.chat_completion(self._question_messages(question, context))
     
     def explain_spectrogram(
-        self, 
+        self,
         audio_features: Optional[Dict[str, Any]] = None,
         custom_context: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -221,57 +571,745 @@ class MistralClient:
         Args:
             audio_features: Optional audio features to include in explanation
             custom_context: Optional custom context
-            
+        
         Returns:
             Dictionary containing the explanation response
         """
-        # Base explanation prompt
-        question = """Please explain what a spectrogram shows in audio analysis. 
-        Focus on:
-        1. What the visual representation means
-        2. How frequency and time are displayed
-        3. What different colors/intensities represent
-        4. How this helps in understanding audio characteristics
+        return self.chat_completion(self._spectrogram_messages(audio_features, custom_context))
+    
+    def health_check(self) -> bool:
+        """
+        Perform a health check on the Mistral API connection
         
-        Keep the explanation clear and accessible while being technically accurate."""
+        Lists the available models instead of running a (billed) completion.
+        A successful result is reused for ``settings.health_check_ttl`` seconds.
         
-        # Add audio features context if available
-        if audio_features:
-            context_parts = ["Audio Analysis Context:"]
-            
-            if 'duration' in audio_features:
-                context_parts.append(f"- Duration: {audio_features['duration']:.2f} seconds")
+        Returns:
+            True if API is accessible, False otherwise
+        """
+        now = time.monotonic()
+        if self._last_healthy_at is not None and now - self._last_healthy_at < self.settings.health_check_ttl:
+            return True
+        
+        try:
+            response = self.session.get(self.models_url, timeout=HEALTH_CHECK_TIMEOUT)
+            healthy = response.status_code == 200
+            if not healthy:
+                logger.error(f"Health check failed: {response.status_code} - {response.text}")
             
-            if 'tempo' in audio_features:
-                context_parts.append(f"- Tempo: {audio_features['tempo']:.1f} BPM")
+            self._last_healthy_at = now if healthy else None
+            return healthy
+        
+        except Exception as e:
+            logger.error(f"Health check failed: {str(e)}")
+            return False
+    
+    def submit_batch(
+        self,
+        requests_by_id: Dict[str, List[Dict[str, str]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Submit chat completions to the Batch API for offline processing
+        
+        Batch jobs are billed at a lower rate but finish asynchronously;
+        collect their results with get_batch_results.
+        
+        Args:
+            requests_by_id: Messages of each request, keyed by a custom id
+            temperature: Sampling temperature (defaults to settings)
+            max_tokens: Maximum tokens to generate (defaults to settings)
+            metadata: Optional metadata stored with the job
+        
+        Returns:
+            Dictionary containing the batch id and job status
+        """
+        try:
+            lines = []
+            for custom_id, messages in requests_by_id.items():
+                body = self._prepare_payload(self._filter_messages(messages), temperature, max_tokens)
+                del body["model"]  # set once on the job
+                lines.append(json_codec.dumps({"custom_id": custom_id, "body": body}))
             
-            if 'spectral_centroid' in audio_features:
-                context_parts.append(f"- Spectral Centroid: {audio_features['spectral_centroid']:.1f} Hz")
+            # Upload the requests as a JSONL file; unset the session's JSON
+            # content type so requests sends its multipart header instead
+            upload = self.session.post(
+                self.files_url,
+                files={"file": ("batch.jsonl", b"\n".join(lines), "application/jsonl")},
+                data={"purpose": "batch"},
+                headers={"Content-Type": None},
+                timeout=self.settings.request_timeout
+            )
+            if upload.status_code != 200:
+                return self._handle_error_status(upload.status_code, upload.text)
             
-            if 'rms_energy' in audio_features:
-                context_parts.append(f"- RMS Energy: {audio_features['rms_energy']:.4f}")
+            job_request: Dict[str, Any] = {
+                "input_files": [json_codec.loads(upload.content)["id"]],
+                "model": self._model,
+                "endpoint": "/v1/chat/completions"
+            }
+            if metadata:
+                job_request["metadata"] = metadata
             
-            context = "\\n".join(context_parts)
+            response = self.session.post(
+                self.batch_jobs_url,
+                data=json_codec.dumps(job_request),
+                timeout=self.settings.request_timeout
+            )
+            if response.status_code != 200:
+                return self._handle_error_status(response.status_code, response.text)
             
-            if custom_context:
-                context += f"\\n\\nAdditional Context: {custom_context}"
+            job = json_codec.loads(response.content)
+            logger.info(f"Submitted batch job {job['id']} with {len(lines)} requests")
+            return {
+                'success': True,
+                'batch_id': job['id'],
+                'status': job.get('status')
+            }
         
-        else:
-            context = custom_context
+        except requests.exceptions.RequestException as e:
+            return self._error_result(f"Batch submission failed: {str(e)}")
+        
+        except ValueError as e:
+            logger.error(f"Content validation failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
         
-        return self.ask_question(question, context)
+        except Exception as e:
+            return self._error_result(f"Unexpected error: {str(e)}")
     
-    def health_check(self) -> bool:
+    def submit_question_batch(self, questions: Dict[str, str]) -> Dict[str, Any]:
         """
-        Perform a health check on the Mistral API connection
+        Submit simple questions to the Batch API (see ask_question)
+        
+        Args:
+            questions: Questions keyed by a custom id
         
         Returns:
-            True if API is accessible, False otherwise
+            Dictionary containing the batch id and job status
+        """
+        return self.submit_batch({
+            custom_id: self._question_messages(question)
+            for custom_id, question in questions.items()
+        })
+    
+    def get_batch_results(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Check a batch job and download its results once it has finished
+        
+        Args:
+            batch_id: Id returned by submit_batch
+        
+        Returns:
+            Dictionary containing the job status and, for finished jobs,
+            'results' mapping each custom id to a chat completion result
+            (None while the job is still queued or running)
         """
         try:
-            response = self.ask_question("Hello, this is a health check. Please respond with 'OK'.")
-            return response.get('success', False)
+            response = self.session.get(
+                f"{self.batch_jobs_url}/{batch_id}",
+                timeout=self.settings.request_timeout
+            )
+            if response.status_code != 200:
+                return self._handle_error_status(response.status_code, response.text)
+            
+            job = json_codec.loads(response.content)
+            status = job.get('status')
+            if status not in BATCH_FINAL_STATUSES:
+                return {
+                    'success': True,
+                    'batch_id': batch_id,
+                    'status': status,
+                    'results': None
+                }
+            
+            if not job.get('output_file'):
+                return self._error_result(f"Batch job {batch_id} finished with status {status} and no output")
+            
+            output = self.session.get(
+                f"{self.files_url}/{job['output_file']}/content",
+                timeout=self.settings.request_timeout
+            )
+            if output.status_code != 200:
+                return self._handle_error_status(output.status_code, output.text)
+            
+            results = {}
+            for line in output.content.splitlines():
+                if line.strip():
+                    entry = json_codec.loads(line)
+                    results[entry['custom_id']] = self._batch_entry_result(entry)
+            
+            return {
+                'success': True,
+                'batch_id': batch_id,
+                'status': status,
+                'results': results
+            }
+        
+        except requests.exceptions.RequestException as e:
+            return self._error_result(f"Batch status request failed: {str(e)}")
         
         except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
+            return self._error_result(f"Unexpected error: {str(e)}")
+    
+    def _batch_entry_result(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the chat completion result for one line of a batch output file"""
+        response = entry.get('response') or {}
+        if response.get('status_code') == 200 and response.get('body'):
+            return self._handle_success_response(response['body'])
+        
+        return {
+            'success': False,
+            'error': entry.get('error') or f"Batch request failed: {response.get('status_code')}"
+        }
+
+
+@lru_cache(maxsize=1)
+def get_mistral_client() -> MistralClient:
+    """Get the shared Mistral client so its pooled connections are reused"""
+    return MistralClient()
+
+
+class MistralAsyncClient(_MistralClientBase):
+    """
+    Asynchronous Mistral AI client built on a shared HTTP session
+    
+    Requests issued concurrently (e.g. via asyncio.gather) overlap their
+    network and generation latency instead of running back to back. The
+    session is created on first use inside the running event loop; close
+    it with ``aclose()`` or use the client as an async context manager.
+    
+    The session is an aiohttp.ClientSession, or an HTTP/2 httpx.AsyncClient
+    when ``settings.enable_http2`` is set and httpx[http2] is installed, so
+    concurrent requests share one multiplexed connection.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._session = None
+        
+        # Identical requests currently in flight, keyed by _inflight_key, and
+        # the number of callers waiting on each
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._inflight_waiters: Dict[str, int] = {}
+        self._http2 = self.settings.enable_http2 and self._http2_available()
+    
+    @staticmethod
+    def _http2_available() -> bool:
+        """Check that httpx and its HTTP/2 support are installed"""
+        try:
+            import httpx  # noqa: F401
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("httpx[http2] is not installed; using HTTP/1.1 via aiohttp")
+            return False
+        return True
+    
+    def _get_session(self):
+        """Create the shared HTTP session on first use"""
+        if self._http2:
+            if self._session is None or self._session.is_closed:
+                import httpx
+                
+                self._session = httpx.AsyncClient(
+                    http2=True,
+                    headers=self.headers,
+                    timeout=self.settings.request_timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.settings.http_pool_maxsize,
+                        max_keepalive_connections=self.settings.http_pool_maxsize,
+                        keepalive_expiry=300
+                    )
+                )
+            return self._session
+        
+        if self._session is None or self._session.closed:
+            import aiohttp
+            
+            connector = aiohttp.TCPConnector(
+                limit=self.settings.http_pool_maxsize,
+                limit_per_host=self.settings.http_pool_maxsize,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.settings.request_timeout)
+            )
+        return self._session
+    
+    def _transport_errors(self) -> Tuple[Tuple[type, ...], Tuple[type, ...]]:
+        """Return the (timeout, request failure) exception types of the session"""
+        if self._http2:
+            import httpx
+            return (httpx.TimeoutException,), (httpx.HTTPError,)
+        
+        import aiohttp
+        return (asyncio.TimeoutError,), (aiohttp.ClientError,)
+    
+    async def _post(self, payload: Dict[str, Any]) -> Tuple[int, bytes, Optional[str]]:
+        """
+        POST a payload to the chat completions endpoint
+        
+        Returns:
+            Tuple of (status, body, Retry-After header value or None)
+        """
+        session = self._get_session()
+        body = json_codec.dumps(payload)
+        
+        if self._http2:
+            response = await session.post(self.settings.mistral_api_url, content=body)
+            return response.status_code, response.content, response.headers.get("Retry-After")
+        
+        async with session.post(self.settings.mistral_api_url, data=body) as response:
+            return response.status, await response.read(), response.headers.get("Retry-After")
+    
+    async def _post_stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        POST a streaming payload and yield the response body line by line
+        
+        Raises:
+            httpx.HTTPStatusError or aiohttp.ClientResponseError: On a non-200 status
+        """
+        session = self._get_session()
+        body = json_codec.dumps(payload)
+        
+        if self._http2:
+            import httpx
+            
+            async with session.stream("POST", self.settings.mistral_api_url, content=body) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    error = self._handle_error_status(response.status_code, response.text)
+                    raise httpx.HTTPStatusError(
+                        error['error'], request=response.request, response=response
+                    )
+                
+                async for line in response.aiter_lines():
+                    yield line
+            return
+        
+        import aiohttp
+        
+        async with session.post(self.settings.mistral_api_url, data=body) as response:
+            if response.status != 200:
+                error = self._handle_error_status(response.status, await response.text())
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=error['error']
+                )
+            
+            async for raw_line in response.content:
+                yield raw_line.decode("utf-8")
+    
+    def _should_offload_filtering(self, contents: List[Optional[str]]) -> bool:
+        """Whether filtering this much content is worth moving off the event loop"""
+        if self.content_filter is None:
             return False
+        return sum(len(content or "") for content in contents) >= OFFLOAD_FILTER_MIN_CHARS
+    
+    async def _afilter_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Run _filter_messages, on the filter pool when the messages are long"""
+        if not self._should_offload_filtering([message.get('content') for message in messages]):
+            return self._filter_messages(messages)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_FILTER_POOL, self._filter_messages, messages)
+    
+    async def _ahandle_success_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Run _handle_success_response, on the filter pool when the reply is long"""
+        try:
+            content = result['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            content = None
+        
+        if not self._should_offload_filtering([content]):
+            return self._handle_success_response(result)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_FILTER_POOL, self._handle_success_response, result)
+    
+    async def aclose(self):
+        """Close the underlying HTTP session"""
+        if self._session is not None:
+            if self._http2:
+                await self._session.aclose()
+            elif not self._session.closed:
+                await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self) -> "MistralAsyncClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        bypass_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Send a chat completion request to Mistral AI without blocking the event loop
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            bypass_cache: Skip the response cache and in-flight request sharing
+        
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        if bypass_cache:
+            return await self._chat_completion(messages, temperature, max_tokens, bypass_cache)
+        
+        # Concurrent identical requests share a single API call. A None result
+        # means the leading caller was cancelled, so the request is issued again.
+        key = self._inflight_key(messages, temperature, max_tokens)
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            logger.debug(f"Coalesced request {key[:12]} with an identical one in flight")
+            self._inflight_waiters[key] += 1
+            try:
+                result = await asyncio.shield(future)
+            finally:
+                # A caller cancelled while the request is still in flight stops waiting
+                if self._inflight.get(key) is future:
+                    self._inflight_waiters[key] -= 1
+            if result is not None:
+                return dict(result)
+        
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        self._inflight_waiters[key] = 0
+        try:
+            result = await self._chat_completion(messages, temperature, max_tokens, bypass_cache)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; let waiting callers retry
+            future.set_result(None)
+            raise
+        except BaseException as e:
+            # Only hand the exception to waiting callers, so it is always retrieved
+            if self._inflight_waiters[key]:
+                future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+            del self._inflight_waiters[key]
+    
+    async def _chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        bypass_cache: bool
+    ) -> Dict[str, Any]:
+        """Filter, send and cache a single chat completion request"""
+        timeout_errors, request_errors = self._transport_errors()
+        
+        try:
+            # Validate input messages
+            messages = await self._afilter_messages(messages)
+            
+            # Prepare request
+            payload = self._prepare_payload(messages, temperature, max_tokens)
+            
+            cache_key = self._response_cache_key(payload, bypass_cache)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
+            
+            logger.info(f"Sending request to Mistral API with {len(messages)} messages")
+            
+            # Retry honouring Retry-After, else with exponential backoff,
+            # matching the sync client's Retry strategy
+            attempt = 0
+            while True:
+                status, body, retry_after = await self._post(payload)
+                if status == 200:
+                    result = await self._ahandle_success_response(json_codec.loads(body))
+                    self._store_cached_response(cache_key, result)
+                    return result
+                
+                if status not in RETRY_STATUS_CODES or attempt >= self.settings.max_retries:
+                    return self._handle_error_status(status, body.decode("utf-8", errors="replace"))
+                
+                delay = _parse_retry_after(retry_after)
+                await asyncio.sleep(2 ** attempt if delay is None else delay)
+                attempt += 1
+        
+        except timeout_errors:
+            return self._error_result(f"Request timeout after {self.settings.request_timeout} seconds")
+        
+        except request_errors as e:
+            return self._error_result(f"Request failed: {str(e)}")
+        
+        except ValueError as e:
+            logger.error(f"Content validation failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        
+        except Exception as e:
+            return self._error_result(f"Unexpected error: {str(e)}")
+    
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from Mistral AI as it is generated
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+        
+        Yields:
+            Filtered pieces of the response text, a sentence at a time
+        
+        Raises:
+            ValueError: If content fails safety checks
+            aiohttp.ClientError or httpx.HTTPError: If API request fails
+        """
+        messages = await self._afilter_messages(messages)
+        payload = self._prepare_payload(messages, temperature, max_tokens)
+        payload["stream"] = True
+        
+        logger.info(f"Streaming request to Mistral API with {len(messages)} messages")
+        
+        buffer = ""
+        async for line in self._post_stream(payload):
+            delta = self._parse_sse_line(line.strip())
+            if delta is None:
+                continue
+            
+            ready, buffer = self._take_complete_sentences(buffer + delta)
+            if ready:
+                yield ready
+        
+        if buffer:
+            yield self._filter_stream_segment(buffer)
+    
+    async def ask_question(self, question: str, context: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ask a simple question to Mistral AI
+        
+        Args:
+            question: The question to ask
+            context: Optional context to provide
+        
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        return await self.chat_completion(self._question_messages(question, context))
+    
+    async def explain_spectrogram(
+        self,
+        audio_features: Optional[Dict[str, Any]] = None,
+        custom_context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get an explanation of what a spectrogram shows
+        
+        Args:
+            audio_features: Optional audio features to include in explanation
+            custom_context: Optional custom context
+        
+        Returns:
+            Dictionary containing the explanation response
+        """
+        return await self.chat_completion(self._spectrogram_messages(audio_features, custom_context))
+
+
+class BatchedMistralClient(MistralAsyncClient):
+    """
+    Async client that coalesces concurrent questions into one chat completion
+    
+    Questions passed to ``ask_question`` are queued; a worker collects up to
+    ``max_batch`` of them (waiting at most ``batch_window`` seconds after the
+    first) and sends them as a single request holding a numbered JSON array
+    of the questions and asking for a JSON array of answers. If the reply cannot be parsed, each question is retried on its
+    own. Long prompts bypass the queue entirely, and spectrogram explanations
+    are sent directly so they keep their cacheable prompt prefix.
+    """
+    
+    BATCH_SYSTEM_PROMPT = (
+        "You will receive a JSON array of {count} numbered questions. "
+        "Reply with a JSON array of {count} strings containing the answers, in order, "
+        "and nothing else."
+    )
+    
+    def __init__(self, max_batch: int = 8, batch_window: float = 0.25, max_prompt_chars: int = 4000):
+        super().__init__()
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_prompt_chars = max_prompt_chars
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: set = set()
+    
+    async def ask_question(self, question: str, context: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ask a question, batching it with other questions asked concurrently
+        
+        Args:
+            question: The question to ask
+            context: Optional context to provide
+            
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        if len(question) + len(context or "") > self.max_prompt_chars:
+            return await super().ask_question(question, context)
+        
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._collect_batches())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((question, context, future))
+        return await future
+    
+    async def aclose(self):
+        """Stop the batching worker and close the underlying HTTP session"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await super().aclose()
+    
+    async def _collect_batches(self):
+        """Group queued questions into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = loop.create_task(self._dispatch(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[str, Optional[str], "asyncio.Future"]]):
+        """Send one batch and resolve each caller's future"""
+        try:
+            if len(batch) == 1:
+                question, context, future = batch[0]
+                results = [await MistralAsyncClient.ask_question(self, question, context)]
+            else:
+                results = await self._ask_batch(batch)
+        except Exception as e:
+            results = [self._error_result(f"Unexpected error: {str(e)}")] * len(batch)
+        
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    async def _ask_batch(self, batch: List[Tuple[str, Optional[str], "asyncio.Future"]]) -> List[Dict[str, Any]]:
+        """Ask several questions in one request, falling back to individual requests"""
+        prompt = await self._batch_prompt(batch)
+        answers = None
+        if prompt is not None:
+            messages = [
+                {"role": "system", "content": self.BATCH_SYSTEM_PROMPT.format(count=len(batch))},
+                {"role": "user", "content": prompt}
+            ]
+            response = await self.chat_completion(
+                messages,
+                max_tokens=min(self.settings.max_tokens * len(batch), 4000)
+            )
+            if response['success']:
+                answers = self._parse_batch_answers(response, len(batch))
+        
+        if answers is None:
+            logger.warning(f"Batched request for {len(batch)} questions failed, retrying individually")
+            return await asyncio.gather(*[
+                MistralAsyncClient.ask_question(self, question, context)
+                for question, context, _ in batch
+            ])
+        
+        logger.info(f"Answered {len(batch)} questions with one batched request")
+        return [
+            {
+                'success': True,
+                'response': response['response'],
+                'content': answer,
+                'usage': response['usage'],
+                'model': response['model'],
+                'batch_size': len(batch)
+            }
+            for answer in answers
+        ]
+    
+    async def _batch_prompt(self, batch: List[Tuple[str, Optional[str], "asyncio.Future"]]) -> Optional[str]:
+        """
+        Build the numbered JSON array of questions for a batched request
+        
+        Each question is filtered on its own first. Filtering the array as a
+        whole could break its quoting (URLs are removed up to the next
+        whitespace); text that was already filtered passes through unchanged.
+        
+        Returns:
+            The JSON array, or None if a question fails the safety checks
+        """
+        blocks = [
+            {"content": f"Context: {context}\n\n{question}" if context else question}
+            for question, context, _ in batch
+        ]
+        try:
+            blocks = await self._afilter_messages(blocks)
+        except ValueError:
+            return None
+        
+        return json_codec.dumps([
+            {"number": number, "question": block["content"]}
+            for number, block in enumerate(blocks, 1)
+        ]).decode("utf-8")
+    
+    @staticmethod
+    def _parse_batch_answers(response: Dict[str, Any], count: int) -> Optional[List[str]]:
+        """Extract the JSON array of answers from a batched response"""
+        # The guardrails may append a note after the array, so decode only
+        # the first JSON value instead of the whole content
+        content = response.get('content') or ''
+        start = content.find('[')
+        if start == -1:
+            return None
+        
+        try:
+            answers, _ = json.JSONDecoder().raw_decode(content, start)
+        except ValueError:
+            return None
+        
+        if not isinstance(answers, list) or len(answers) != count:
+            return None
+        return [str(answer) for answer in answers]
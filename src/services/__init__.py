@@ -2,5 +2,6 @@
 
 from .analysis_service import AudioAnalysisService
 from .chat_service import ChatService
+from .results import AnalysisResult
 
-__all__ = ["AudioAnalysisService", "ChatService"]
+__all__ = ["AudioAnalysisService", "ChatService", "AnalysisResult"]
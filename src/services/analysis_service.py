@@ -1,11 +1,16 @@
 """Audio analysis service that orchestrates audio processing and AI explanations"""
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
-from ..core import AudioProcessor, MistralClient
+from ..core import MistralAsyncClient, BatchedMistralClient, get_audio_processor, get_mistral_client
 from ..config import get_settings
+from ..utils.formatting import format_audio_features
+from .results import AnalysisResult
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +20,15 @@ class AudioAnalysisService:
     
     def __init__(self):
         self.settings = get_settings()
-        self.audio_processor = AudioProcessor()
-        self.mistral_client = MistralClient()
+        self.audio_processor = get_audio_processor()
+        self.mistral_client = get_mistral_client()
     
     def analyze_audio_with_explanation(
         self, 
         file_path: str,
         custom_question: Optional[str] = None,
         include_features: bool = True
-    ) -> Dict[str, Any]:
+    ) -> AnalysisResult:
         """
         Perform complete audio analysis with AI explanation
         
@@ -31,9 +36,9 @@ class AudioAnalysisService:
             file_path: Path to the audio file
             custom_question: Custom question to ask about the audio
             include_features: Whether to include detailed audio features
-            
+        
         Returns:
-            Dictionary containing analysis results and AI explanation
+            Analysis result with AI explanation (see AnalysisResult.to_dict)
         """
         try:
             logger.info(f"Starting audio analysis for: {file_path}")
@@ -42,11 +47,11 @@ class AudioAnalysisService:
             audio_result = self.audio_processor.analyze_audio_file(file_path)
             
             if not audio_result['success']:
-                return {
-                    'success': False,
-                    'error': f"Audio analysis failed: {audio_result['error']}",
-                    'stage': 'audio_processing'
-                }
+                return AnalysisResult.failure(
+                    file_path,
+                    f"Audio analysis failed: {audio_result['error']}",
+                    'audio_processing'
+                )
             
             # Prepare features for AI context
             features = audio_result['features'] if include_features else None
@@ -64,86 +69,138 @@ class AudioAnalysisService:
                 )
             
             # Combine results
-            result = {
-                'success': True,
-                'file_path': file_path,
-                'audio_analysis': {
-                    'spectrogram_path': audio_result['spectrogram_path'],
-                    'features': audio_result['features'] if include_features else None,
-                },
-                'ai_explanation': {
-                    'success': ai_result['success'],
-                    'content': ai_result.get('content', ''),
-                    'error': ai_result.get('error') if not ai_result['success'] else None
-                },
-                'metadata': {
-                    'model_used': ai_result.get('model', self.settings.mistral_model),
-                    'analysis_timestamp': self._get_timestamp(),
-                    'custom_question': custom_question
-                }
-            }
+            result = self._compile_result(
+                file_path, audio_result, ai_result, custom_question, include_features
+            )
             
             logger.info(f"Audio analysis completed successfully for: {file_path}")
             return result
         
         except Exception as e:
             logger.error(f"Audio analysis service error: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'stage': 'service_orchestration'
-            }
+            return AnalysisResult.failure(file_path, str(e), 'service_orchestration')
     
-    def analyze_multiple_files(
+    async def _aanalyze_with_explanation(
+        self,
+        client: MistralAsyncClient,
+        semaphore: asyncio.Semaphore,
+        executor: Executor,
+        file_path: str,
+        custom_question: Optional[str],
+        include_features: bool
+    ) -> AnalysisResult:
+        """Async counterpart of analyze_audio_with_explanation used for batches"""
+        try:
+            logger.info(f"Starting audio analysis for: {file_path}")
+            
+            # Audio decoding and feature extraction are CPU-bound; keep them off the event loop
+            loop = asyncio.get_running_loop()
+            audio_result = await loop.run_in_executor(
+                executor, self.audio_processor.analyze_audio_file, file_path
+            )
+            
+            if not audio_result['success']:
+                return AnalysisResult.failure(
+                    file_path,
+                    f"Audio analysis failed: {audio_result['error']}",
+                    'audio_processing'
+                )
+            
+            features = audio_result['features'] if include_features else None
+            
+            async with semaphore:
+                if custom_question:
+                    ai_result = await client.ask_question(
+                        custom_question, 
+                        context=self._format_audio_context(features, file_path)
+                    )
+                else:
+                    ai_result = await client.explain_spectrogram(
+                        audio_features=features,
+                        custom_context=f"Analyzing audio file: {Path(file_path).name}"
+                    )
+            
+            result = self._compile_result(
+                file_path, audio_result, ai_result, custom_question, include_features
+            )
+            
+            logger.info(f"Audio analysis completed successfully for: {file_path}")
+            return result
+        
+        except Exception as e:
+            logger.error(f"Audio analysis service error: {str(e)}")
+            return AnalysisResult.failure(file_path, str(e), 'service_orchestration')
+    
+    async def aanalyze_multiple_files(
         self, 
         file_paths: list,
         custom_question: Optional[str] = None,
         include_features: bool = True
     ) -> Dict[str, Any]:
         """
-        Analyze multiple audio files
+        Analyze multiple audio files concurrently
+        
+        Audio decoding runs on a pool of ``settings.max_workers`` threads and
+        AI requests for all files are issued together through one shared
+        async session, with at most ``settings.max_concurrency`` in flight.
         
         Args:
             file_paths: List of paths to audio files
             custom_question: Custom question to ask about the audio
             include_features: Whether to include detailed audio features
-            
+        
         Returns:
-            Dictionary containing results for all files
+            Dictionary of batch counts, errors and a list of AnalysisResult
+            under 'results'
         """
+        analysis_results: List[AnalysisResult] = []
         results = {
             'success': True,
             'total_files': len(file_paths),
             'successful_analyses': 0,
             'failed_analyses': 0,
-            'results': {},
+            'results': analysis_results,
             'errors': []
         }
         
-        for file_path in file_paths:
-            try:
-                result = self.analyze_audio_with_explanation(
-                    file_path, custom_question, include_features
+        semaphore = asyncio.Semaphore(self.settings.max_concurrency)
+        client_class = BatchedMistralClient if self.settings.enable_batching else MistralAsyncClient
+        with ThreadPoolExecutor(
+            max_workers=self.settings.max_workers,
+            thread_name_prefix="audio-analysis"
+        ) as executor:
+            async with client_class() as client:
+                outcomes = await asyncio.gather(
+                    *[
+                        self._aanalyze_with_explanation(
+                            client, semaphore, executor, file_path, custom_question, include_features
+                        )
+                        for file_path in file_paths
+                    ],
+                    return_exceptions=True
                 )
-                
-                results['results'][file_path] = result
-                
-                if result['success']:
-                    results['successful_analyses'] += 1
-                else:
-                    results['failed_analyses'] += 1
-                    results['errors'].append({
-                        'file': file_path,
-                        'error': result['error']
-                    })
+        
+        for file_path, result in zip(file_paths, outcomes):
+            # BaseException also covers a cancelled analysis (CancelledError)
+            if isinstance(result, BaseException):
+                results['failed_analyses'] += 1
+                results['errors'].append({
+                    'file': file_path,
+                    'error': str(result)
+                })
+                logger.error(f"Failed to analyze {file_path}: {str(result)}")
+                continue
+            
+            analysis_results.append(result)
             
-            except Exception as e:
+            if result.success:
+                results['successful_analyses'] += 1
+            else:
                 results['failed_analyses'] += 1
                 results['errors'].append({
                     'file': file_path,
-                    'error': str(e)
+                    'error': result.error
                 })
-                logger.error(f"Failed to analyze {file_path}: {str(e)}")
         
         results['success'] = results['successful_analyses'] > 0
         
@@ -153,13 +210,38 @@ class AudioAnalysisService:
         
         return results
     
+    def analyze_multiple_files(
+        self, 
+        file_paths: list,
+        custom_question: Optional[str] = None,
+        include_features: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Analyze multiple audio files
+        
+        Runs aanalyze_multiple_files in a new event loop; async callers should
+        await that method directly.
+        
+        Args:
+            file_paths: List of paths to audio files
+            custom_question: Custom question to ask about the audio
+            include_features: Whether to include detailed audio features
+        
+        Returns:
+            Dictionary of batch counts, errors and a list of AnalysisResult
+            under 'results'
+        """
+        return asyncio.run(
+            self.aanalyze_multiple_files(file_paths, custom_question, include_features)
+        )
+    
     def generate_spectrogram_only(self, file_path: str) -> Dict[str, Any]:
         """
         Generate only the spectrogram without AI explanation
         
         Args:
             file_path: Path to the audio file
-            
+        
         Returns:
             Dictionary containing spectrogram generation result
         """
@@ -194,7 +276,7 @@ class AudioAnalysisService:
         
         Args:
             file_path: Path to the audio file
-            
+        
         Returns:
             Dictionary containing audio features
         """
@@ -219,31 +301,40 @@ class AudioAnalysisService:
                 'file_path': file_path
             }
     
+    def _compile_result(
+        self,
+        file_path: str,
+        audio_result: Dict[str, Any],
+        ai_result: Dict[str, Any],
+        custom_question: Optional[str],
+        include_features: bool
+    ) -> AnalysisResult:
+        """Combine audio analysis and AI explanation into the service result"""
+        return AnalysisResult(
+            success=True,
+            file_path=file_path,
+            spectrogram_path=audio_result['spectrogram_path'],
+            features=audio_result['features'] if include_features else None,
+            ai_success=ai_result['success'],
+            ai_content=ai_result.get('content', ''),
+            ai_error=ai_result.get('error') if not ai_result['success'] else None,
+            model_used=ai_result.get('model', self.settings.mistral_model),
+            timestamp=self._get_timestamp(),
+            custom_question=custom_question,
+            error=None,
+            stage=None
+        )
+    
     def _format_audio_context(self, features: Optional[Dict[str, Any]], file_path: str) -> str:
         """Format audio features into context for AI"""
         if not features:
             return f"Audio file: {Path(file_path).name}"
         
-        context_parts = [f"Audio Analysis of: {Path(file_path).name}"]
-        
-        if 'duration' in features:
-            context_parts.append(f"Duration: {features['duration']:.2f} seconds")
-        
-        if 'tempo' in features:
-            context_parts.append(f"Tempo: {features['tempo']:.1f} BPM")
-        
-        if 'spectral_centroid' in features:
-            context_parts.append(f"Spectral Centroid: {features['spectral_centroid']:.1f} Hz")
-        
-        if 'rms_energy' in features:
-            context_parts.append(f"RMS Energy: {features['rms_energy']:.4f}")
-        
-        return "\\n".join(context_parts)
+        return format_audio_features(features, f"Audio Analysis of: {Path(file_path).name}")
     
     def _get_timestamp(self) -> str:
-        """Get current timestamp for metadata"""
-        from datetime import datetime
-        return datetime.now().isoformat()
+        """Get current UTC timestamp for metadata"""
+        return datetime.now(timezone.utc).isoformat(timespec="seconds")
     
     def health_check(self) -> Dict[str, Any]:
         """
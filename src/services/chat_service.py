@@ -1,34 +1,102 @@
 """Interactive chat service with guardrails for audio analysis discussions"""
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple, Union
 
-from ..core import MistralClient
+from ..core import MistralAsyncClient, get_mistral_client
 from ..config import get_settings
+from ..utils import json_codec
 from ..utils.guardrails import ContentFilter
+from ..utils.response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
 
+# Shared read-only sentinel for responses without usage data; do not mutate
+_EMPTY_USAGE: Dict[str, Any] = {}
+
+# (epoch second, formatted timestamp) of the last _iso_now call
+_last_timestamp: Tuple[int, str] = (-1, "")
+
+
+def _iso_now(_time=time.time) -> str:
+    """Current UTC time in ISO 8601 with second precision, formatted once per second"""
+    global _last_timestamp
+    
+    second = int(_time())
+    cached_second, formatted = _last_timestamp
+    if second != cached_second:
+        formatted = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(second))
+        _last_timestamp = (second, formatted)
+    return formatted
+
+
+class _RateLimiter:
+    """Spaces out request starts to stay under a per-minute limit"""
+    
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute
+        self._next_start = 0.0
+    
+    async def wait(self):
+        """Wait until the next request may start"""
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
 class ChatService:
     """Interactive chat service focused on audio analysis with conversation management"""
     
     def __init__(self):
         self.settings = get_settings()
-        self.mistral_client = MistralClient()
+        self.mistral_client = get_mistral_client()
         self.content_filter = ContentFilter()
-        self.conversation_history: List[Dict[str, str]] = []
+        self.session_id = uuid.uuid4().hex
         self.max_history = 10  # Keep last 10 exchanges
+        self.conversation_history: Deque[Dict[str, str]] = deque(maxlen=self.max_history)
+        
+        # API messages reused across turns: the constant system prompt and the
+        # user/assistant messages of the last 5 exchanges
+        self._system_message: Dict[str, Any] = {
+            "role": "system",
+            "content": self.content_filter.get_system_prompt()
+        }
+        self._recent_messages: Deque[Dict[str, str]] = deque(maxlen=10)
+        
+        # Replies to identical conversation states (retries, repeated questions),
+        # cached at any temperature; memory-only and per service instance
+        self._response_cache: Optional[ResponseCache] = (
+            ResponseCache(max_entries=self.settings.chat_cache_size)
+            if self.settings.enable_response_cache and self.settings.chat_cache_size > 0
+            else None
+        )
+        
+        # Async client for the a* methods, bound to the event loop it was created in,
+        # and the number of open `async with` blocks and async calls using it
+        self._async_client: Optional[MistralAsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_users = 0
     
-    def start_conversation(self) -> Dict[str, Any]:
+    def start_conversation(self, serialize: bool = False) -> Union[Dict[str, Any], bytes]:
         """
         Start a new conversation session
         
+        Args:
+            serialize: Return the result as JSON bytes (encoded with orjson when installed)
+        
         Returns:
             Dictionary containing session information
         """
-        self.conversation_history = []
+        self.session_id = uuid.uuid4().hex
+        self.conversation_history.clear()
+        self._recent_messages.clear()
         
         welcome_message = (
             "Hello! I'm your audio analysis assistant. I can help you understand "
@@ -36,10 +104,10 @@ class ChatService:
             "\\n\\nWhat would you like to know about audio analysis today?"
         )
         
-        return {
+        return self._encode_result({
             'success': True,
             'message': welcome_message,
-            'session_started': datetime.now().isoformat(),
+            'session_started': self._get_timestamp(),
             'capabilities': [
                 'Audio file analysis and spectrogram generation',
                 'Explanation of audio features and characteristics',
@@ -47,71 +115,172 @@ class ChatService:
                 'Spectrogram interpretation',
                 'Audio format and technical questions'
             ]
-        }
+        }, serialize)
     
-    def send_message(self, user_message: str, context_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def send_message(
+        self,
+        user_message: str,
+        context_data: Optional[Dict[str, Any]] = None,
+        serialize: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Send a message to the chat service
         
         Args:
             user_message: The user's message
             context_data: Optional context data (audio features, file info, etc.)
+            serialize: Return the result as JSON bytes (encoded with orjson when installed)
             
         Returns:
             Dictionary containing the response and metadata
         """
+        # One timestamp for the result and the history entry
+        timestamp = self._get_timestamp()
+        
         try:
-            # Validate and filter the user message
-            validation_result = self.content_filter.validate_question(user_message)
+            messages, rejection = self._prepare_messages(user_message, context_data, timestamp)
+            if rejection is not None:
+                return self._encode_result(rejection, serialize)
             
-            if not validation_result['is_valid']:
-                return {
-                    'success': False,
-                    'error': validation_result['reason'],
-                    'user_message': user_message,
-                    'timestamp': datetime.now().isoformat()
-                }
+            # Get response from Mistral, unless this exact request was answered before
+            cache_key = self._chat_cache_key(messages)
+            response = self._get_cached_chat_response(cache_key)
+            if response is None:
+                response = self.mistral_client.chat_completion(messages)
+                self._store_chat_response(cache_key, response)
             
-            # Use the modified question if available
-            processed_message = validation_result.get('modified_question', user_message)
+            return self._encode_result(
+                self._handle_chat_response(user_message, response, timestamp), serialize
+            )
+        
+        except Exception as e:
+            return self._encode_result(self._chat_error(user_message, e, timestamp), serialize)
+    
+    async def asend_message(
+        self,
+        user_message: str,
+        context_data: Optional[Dict[str, Any]] = None,
+        serialize: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Send a message to the chat service without blocking the event loop
+        
+        Args:
+            user_message: The user's message
+            context_data: Optional context data (audio features, file info, etc.)
+            serialize: Return the result as JSON bytes (encoded with orjson when installed)
             
-            # Build conversation context
-            messages = self._build_conversation_context(processed_message, context_data)
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        timestamp = self._get_timestamp()
+        
+        try:
+            messages, rejection = self._prepare_messages(user_message, context_data, timestamp)
+        except Exception as e:
+            return self._encode_result(self._chat_error(user_message, e, timestamp), serialize)
+        
+        if rejection is not None:
+            return self._encode_result(rejection, serialize)
+        
+        async with self:
+            result = await self._acomplete_message(user_message, messages, timestamp)
+        return self._encode_result(result, serialize)
+    
+    async def send_messages(
+        self,
+        user_messages: List[str],
+        context_data: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limit_per_minute: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Send many independent messages concurrently, with bounded concurrency
+        
+        All messages are validated and built against the conversation history
+        as it was when the batch started, so they do not see each other's
+        replies; exchanges are added to the history as responses arrive.
+        
+        Args:
+            user_messages: The user's messages
+            context_data: Optional context data shared by all messages
+            max_concurrency: Requests in flight at once (default: settings.max_concurrency)
+            rate_limit_per_minute: Optional limit on requests started per minute
             
-            # Get response from Mistral
-            response = self.mistral_client.chat_completion(messages)
+        Returns:
+            List of response dictionaries, in the order of user_messages
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.settings.max_concurrency)
+        rate_limiter = _RateLimiter(rate_limit_per_minute) if rate_limit_per_minute else None
+        
+        # Replies can be added to the history before later messages are built
+        # (a chat cache hit completes without awaiting), so every message is
+        # built from this snapshot instead of the live history
+        history = list(self._recent_messages)
+        
+        async def send(user_message: str) -> Dict[str, Any]:
+            timestamp = self._get_timestamp()
+            try:
+                messages, rejection = self._prepare_messages(
+                    user_message, context_data, timestamp, history
+                )
+            except Exception as e:
+                return self._chat_error(user_message, e, timestamp)
             
-            if response['success']:
-                # Update conversation history
-                self._update_conversation_history(user_message, response['content'])
-                
-                return {
-                    'success': True,
-                    'user_message': user_message,
-                    'ai_response': response['content'],
-                    'model_used': response.get('model'),
-                    'usage': response.get('usage', {}),
-                    'timestamp': datetime.now().isoformat(),
-                    'conversation_length': len(self.conversation_history)
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': response['error'],
-                    'user_message': user_message,
-                    'timestamp': datetime.now().isoformat()
-                }
+            if rejection is not None:
+                return rejection
+            
+            async with semaphore:
+                if rate_limiter is not None:
+                    await rate_limiter.wait()
+                return await self._acomplete_message(user_message, messages, timestamp)
         
-        except Exception as e:
-            logger.error(f"Chat service error: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'user_message': user_message,
-                'timestamp': datetime.now().isoformat()
-            }
+        async with self:
+            return await asyncio.gather(*[send(message) for message in user_messages])
+    
+    async def abatch_send(
+        self,
+        user_messages: List[str],
+        context_data: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Send several independent messages concurrently
+        
+        Same as send_messages with the default concurrency limit.
+        
+        Args:
+            user_messages: The user's messages
+            context_data: Optional context data shared by all messages
+            
+        Returns:
+            List of response dictionaries, in the order of user_messages
+        """
+        return await self.send_messages(user_messages, context_data)
     
-    def ask_about_audio(self, question: str, audio_features: Dict[str, Any]) -> Dict[str, Any]:
+    async def __aenter__(self) -> "ChatService":
+        """
+        Keep the async client's HTTP session open until the block exits
+        
+        Use ``async with ChatService() as chat:`` to reuse one session (and its
+        pooled connections) across async calls. Outside such a block, each
+        async call closes the session when it finishes.
+        """
+        self._async_users += 1
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self._async_users -= 1
+        if self._async_users == 0:
+            await self.aclose()
+    
+    async def aclose(self):
+        """Close the async client's HTTP session"""
+        if self._async_client is not None:
+            await self._close_async_client(self._async_client, self._async_loop)
+        self._async_client = None
+        self._async_loop = None
+    
+    def ask_about_audio(self, question: str, audio_features: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
         """
         Ask a question about specific audio analysis results
         
@@ -130,7 +299,17 @@ class ChatService:
         
         return self.send_message(question, context_data)
     
-    def explain_concept(self, concept: str) -> Dict[str, Any]:
+    async def aask_about_audio(self, question: str, audio_features: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
+        """Async counterpart of ask_about_audio"""
+        context_data = {
+            'type': 'audio_analysis',
+            'features': audio_features,
+            'context_note': 'User is asking about a specific audio file they analyzed.'
+        }
+        
+        return await self.asend_message(question, context_data)
+    
+    def explain_concept(self, concept: str) -> Union[Dict[str, Any], bytes]:
         """
         Get an explanation of an audio analysis concept
         
@@ -149,10 +328,26 @@ class ChatService:
         
         return self.send_message(question, context_data)
     
-    def get_conversation_summary(self) -> Dict[str, Any]:
+    async def aexplain_concept(self, concept: str) -> Union[Dict[str, Any], bytes]:
+        """Async counterpart of explain_concept"""
+        question = f"Please explain the audio analysis concept: {concept}"
+        
+        context_data = {
+            'type': 'concept_explanation',
+            'context_note': 'User wants to understand an audio analysis concept.'
+        }
+        
+        return await self.asend_message(question, context_data)
+    
+    def get_conversation_summary(self, sync: bool = True) -> Dict[str, Any]:
         """
         Get a summary of the current conversation
         
+        Args:
+            sync: Wait for the summary. If False, the summary is submitted as a
+                (cheaper, offline) Batch API job and its 'batch_id' is returned
+                for fetch_summary.
+        
         Returns:
             Dictionary containing conversation summary
         """
@@ -173,6 +368,16 @@ class ChatService:
                 "Focus on the key topics discussed and main insights shared."
             )
             
+            if not sync:
+                job = self.mistral_client.submit_question_batch({self.session_id: summary_prompt})
+                return {
+                    'success': job['success'],
+                    'batch_id': job.get('batch_id'),
+                    'status': job.get('status'),
+                    'exchanges': len(self.conversation_history),
+                    'error': job.get('error') if not job['success'] else None
+                }
+            
             response = self.mistral_client.ask_question(summary_prompt)
             
             return {
@@ -190,88 +395,310 @@ class ChatService:
                 'exchanges': len(self.conversation_history)
             }
     
-    def clear_conversation(self) -> Dict[str, Any]:
+    def fetch_summary(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get a summary submitted with get_conversation_summary(sync=False)
+        
+        Args:
+            batch_id: Batch job id returned when the summary was submitted
+        
+        Returns:
+            Dictionary containing the job status and, once the job has
+            finished, the summary (None while it is still running)
+        """
+        job = self.mistral_client.get_batch_results(batch_id)
+        if not job['success']:
+            return {
+                'success': False,
+                'batch_id': batch_id,
+                'error': job['error']
+            }
+        
+        if job['results'] is None:
+            return {
+                'success': True,
+                'batch_id': batch_id,
+                'status': job['status'],
+                'summary': None
+            }
+        
+        # A summary job holds a single request
+        response = next(iter(job['results'].values()), None)
+        if response is None:
+            response = {'success': False, 'error': 'Batch job returned no results'}
+        
+        return {
+            'success': response['success'],
+            'batch_id': batch_id,
+            'status': job['status'],
+            'summary': response.get('content', 'Could not generate summary.'),
+            'error': response.get('error') if not response['success'] else None
+        }
+    
+    def clear_conversation(self, serialize: bool = False) -> Union[Dict[str, Any], bytes]:
         """
         Clear the conversation history
         
+        Args:
+            serialize: Return the result as JSON bytes (encoded with orjson when installed)
+        
         Returns:
             Dictionary containing confirmation
         """
         previous_length = len(self.conversation_history)
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self._recent_messages.clear()
         
-        return {
+        return self._encode_result({
             'success': True,
             'message': f'Conversation history cleared. Removed {previous_length} exchanges.',
-            'timestamp': datetime.now().isoformat()
-        }
+            'timestamp': self._get_timestamp()
+        }, serialize)
     
-    def get_conversation_history(self) -> Dict[str, Any]:
+    def get_conversation_history(self, serialize: bool = False) -> Union[Dict[str, Any], bytes]:
         """
         Get the current conversation history
         
+        Args:
+            serialize: Return the result as JSON bytes (encoded with orjson when installed)
+        
         Returns:
             Dictionary containing conversation history
         """
-        return {
+        return self._encode_result({
             'success': True,
-            'history': self.conversation_history.copy(),
+            'history': list(self.conversation_history),
             'exchanges': len(self.conversation_history),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self._get_timestamp()
+        }, serialize)
+    
+    async def _get_async_client(self) -> MistralAsyncClient:
+        """
+        Get the async client for the running event loop
+        
+        The client is normally closed when the last async call or
+        ``async with`` block using it finishes. A client still open from
+        another event loop is replaced and closed, on its own loop if that
+        loop is running in another thread.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_client
+        if client is None or self._async_loop is not loop:
+            previous, previous_loop = client, self._async_loop
+            
+            # Install the new client before awaiting so concurrent callers share it
+            client = self._async_client = MistralAsyncClient()
+            self._async_loop = loop
+            
+            if previous is not None:
+                await self._close_async_client(previous, previous_loop)
+        
+        return client
+    
+    @staticmethod
+    async def _close_async_client(
+        client: MistralAsyncClient,
+        client_loop: Optional[asyncio.AbstractEventLoop]
+    ):
+        """Close an async client, which may belong to another event loop"""
+        running_loop = asyncio.get_running_loop()
+        try:
+            if client_loop is not None and client_loop is not running_loop and client_loop.is_running():
+                # Still running in another thread: close it there
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+                )
+            else:
+                await client.aclose()
+        except RuntimeError as e:
+            if client_loop is not None and client_loop.is_closed():
+                # Its loop is gone, so the client can only be discarded
+                logger.debug(f"Discarded async client from a closed event loop: {str(e)}")
+            else:
+                logger.warning(f"Could not close the async client: {str(e)}")
+        except Exception as e:
+            logger.warning(f"Could not close the async client: {str(e)}")
+    
+    def _prepare_messages(
+        self,
+        user_message: str,
+        context_data: Optional[Dict[str, Any]],
+        timestamp: str,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Validate a user message and build the API messages for it
+        
+        Args:
+            user_message: The user's message
+            context_data: Optional context data (audio features, file info, etc.)
+            timestamp: Timestamp for a rejection result
+            history: Recent history messages to use (default: the current history)
+        
+        Returns:
+            Tuple of (messages, None), or ([], rejection result) if the
+            message fails validation
+        """
+        # Validate and filter the user message
+        validation_result = self.content_filter.validate_question(user_message)
+        
+        if not validation_result['is_valid']:
+            return [], {
+                'success': False,
+                'error': validation_result['reason'],
+                'user_message': user_message,
+                'timestamp': timestamp
+            }
+        
+        # Use the modified question if available
+        processed_message = validation_result['modified_question'] or user_message
+        
+        # Build conversation context
+        return self._build_conversation_context(processed_message, context_data, history), None
+    
+    async def _acomplete_message(
+        self,
+        user_message: str,
+        messages: List[Dict[str, Any]],
+        timestamp: str
+    ) -> Dict[str, Any]:
+        """Get the reply to prepared messages and build the send_message result"""
+        try:
+            # Get response from Mistral, unless this exact request was answered before
+            cache_key = self._chat_cache_key(messages)
+            response = self._get_cached_chat_response(cache_key)
+            if response is None:
+                client = await self._get_async_client()
+                response = await client.chat_completion(messages)
+                self._store_chat_response(cache_key, response)
+            
+            return self._handle_chat_response(user_message, response, timestamp)
+        
+        except Exception as e:
+            return self._chat_error(user_message, e, timestamp)
+    
+    def _chat_cache_key(self, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Return the chat cache key for a request, or None if caching is disabled"""
+        if self._response_cache is None:
+            return None
+        return self._response_cache.make_key({"messages": messages})
+    
+    def _get_cached_chat_response(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Look up the reply to an identical earlier request"""
+        if cache_key is None or self._response_cache is None:
+            return None
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached chat response")
+        return cached
+    
+    def _store_chat_response(self, cache_key: Optional[str], response: Dict[str, Any]):
+        """Cache a reply if caching is enabled and the request succeeded"""
+        if cache_key is not None and self._response_cache is not None and response['success']:
+            self._response_cache.set(cache_key, response)
+    
+    def _handle_chat_response(
+        self,
+        user_message: str,
+        response: Dict[str, Any],
+        timestamp: str
+    ) -> Dict[str, Any]:
+        """Record a successful exchange and build the send_message result"""
+        if response['success']:
+            # Update conversation history
+            self._update_conversation_history(user_message, response['content'], timestamp)
+            
+            return {
+                'success': True,
+                'user_message': user_message,
+                'ai_response': response['content'],
+                'model_used': response.get('model'),
+                'usage': response.get('usage') or _EMPTY_USAGE,
+                'timestamp': timestamp,
+                'conversation_length': len(self.conversation_history)
+            }
+        
+        return {
+            'success': False,
+            'error': response['error'],
+            'user_message': user_message,
+            'timestamp': timestamp
+        }
+    
+    def _chat_error(self, user_message: str, error: Exception, timestamp: str) -> Dict[str, Any]:
+        """Log and build the result for an unexpected send_message error"""
+        logger.error(f"Chat service error: {str(error)}")
+        return {
+            'success': False,
+            'error': str(error),
+            'user_message': user_message,
+            'timestamp': timestamp
         }
     
-    def _build_conversation_context(self, user_message: str, context_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
-        """Build the conversation context for the API call"""
-        messages = []
+    def _build_conversation_context(
+        self,
+        user_message: str,
+        context_data: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the conversation context for the API call
         
-        # Add system prompt
-        system_prompt = self.content_filter.get_system_prompt()
+        The constant system prompt and the history come first so the message
+        prefix stays identical from turn to turn (and can be served from a
+        provider's prompt cache). Per-turn audio context is prepended to the
+        final user message: Mistral rejects a system message after an
+        assistant message, so it cannot follow the history on its own.
+        """
+        recent = self._recent_messages if history is None else history
+        messages = [self._system_message, *recent]
         
-        # Add context data to system prompt if available
+        # Add context data to the current message if available
         if context_data:
             if context_data.get('type') == 'audio_analysis' and 'features' in context_data:
                 features = context_data['features']
-                system_prompt += f\"\\n\\nCurrent audio analysis context:\"
+                lines = ["Current audio analysis context:"]
                 
                 if 'duration' in features:
-                    system_prompt += f\"\\nDuration: {features['duration']:.2f} seconds\"
+                    lines.append(f"Duration: {features['duration']:.2f} seconds")
                 if 'tempo' in features:
-                    system_prompt += f\"\\nTempo: {features['tempo']:.1f} BPM\"
+                    lines.append(f"Tempo: {features['tempo']:.1f} BPM")
                 if 'spectral_centroid' in features:
-                    system_prompt += f\"\\nSpectral Centroid: {features['spectral_centroid']:.1f} Hz\"
-        
-        messages.append({\"role\": \"system\", \"content\": system_prompt})
-        
-        # Add recent conversation history
-        for exchange in self.conversation_history[-5:]:  # Last 5 exchanges
-            messages.append({\"role\": \"user\", \"content\": exchange['user']})
-            messages.append({\"role\": \"assistant\", \"content\": exchange['assistant']})
+                    lines.append(f"Spectral Centroid: {features['spectral_centroid']:.1f} Hz")
+                
+                user_message = "\n".join(lines) + "\n\n" + user_message
         
         # Add current message
-        messages.append({\"role\": \"user\", \"content\": user_message})
+        messages.append({"role": "user", "content": user_message})
         
         return messages
     
-    def _update_conversation_history(self, user_message: str, ai_response: str):
-        \"\"\"Update the conversation history\"\"\"
+    def _update_conversation_history(self, user_message: str, ai_response: str, timestamp: str):
+        """Update the conversation history"""
+        # The deque drops the oldest exchange once max_history is reached
         self.conversation_history.append({
             'user': user_message,
             'assistant': ai_response,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         })
-        
-        # Trim history if it gets too long
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
+        self._recent_messages.append({"role": "user", "content": user_message})
+        self._recent_messages.append({"role": "assistant", "content": ai_response})
     
     def _format_history_for_summary(self) -> str:
-        \"\"\"Format conversation history for summary generation\"\"\"
-        formatted_history = []
-        
-        for i, exchange in enumerate(self.conversation_history, 1):
-            formatted_history.append(f\"Exchange {i}:\")
-            formatted_history.append(f\"User: {exchange['user']}\")
-            formatted_history.append(f\"Assistant: {exchange['assistant'][:200]}...\")  # Truncate for summary
-            formatted_history.append(\"\")
-        
-        return \"\\n\".join(formatted_history)
+        """Format conversation history for summary generation"""
+        # One block per exchange, with the assistant reply truncated for the summary
+        return "\n".join(
+            f"Exchange {i}:\n"
+            f"User: {exchange['user']}\n"
+            f"Assistant: {exchange['assistant'][:200]}...\n"
+            for i, exchange in enumerate(self.conversation_history, 1)
+        )
+    
+    @staticmethod
+    def _encode_result(result: Dict[str, Any], serialize: bool) -> Union[Dict[str, Any], bytes]:
+        """Return a result dictionary, or its JSON encoding if requested"""
+        return json_codec.dumps(result) if serialize else result
+    
+    def _get_timestamp(self) -> str:
+        """Get current UTC timestamp for results and history entries"""
+        return _iso_now()
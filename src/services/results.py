@@ -0,0 +1,99 @@
+"""Result objects returned by the service layer"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class AnalysisResult:
+    """
+    Outcome of analyzing one audio file with an AI explanation
+    
+    A flat object with __slots__ instead of the nested result dicts, which
+    keeps batch results small. Use ``to_dict()`` where the nested dict
+    layout is expected.
+    """
+    
+    __slots__ = (
+        "success",
+        "file_path",
+        "spectrogram_path",
+        "features",
+        "ai_success",
+        "ai_content",
+        "ai_error",
+        "model_used",
+        "timestamp",
+        "custom_question",
+        "error",
+        "stage",
+    )
+    
+    success: bool
+    file_path: str
+    spectrogram_path: Optional[str]
+    features: Optional[Dict[str, Any]]
+    ai_success: bool
+    ai_content: str
+    ai_error: Optional[str]
+    model_used: Optional[str]
+    timestamp: Optional[str]
+    custom_question: Optional[str]
+    error: Optional[str]
+    stage: Optional[str]
+    
+    @classmethod
+    def failure(cls, file_path: str, error: str, stage: str) -> "AnalysisResult":
+        """
+        Build the result for an analysis that failed before an explanation
+        
+        Args:
+            file_path: Path to the audio file
+            error: Error message
+            stage: Pipeline stage that failed
+        
+        Returns:
+            Failed analysis result
+        """
+        return cls(
+            success=False,
+            file_path=file_path,
+            spectrogram_path=None,
+            features=None,
+            ai_success=False,
+            ai_content='',
+            ai_error=None,
+            model_used=None,
+            timestamp=None,
+            custom_question=None,
+            error=error,
+            stage=stage
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result in the nested dictionary layout"""
+        if not self.success:
+            return {
+                'success': False,
+                'error': self.error,
+                'stage': self.stage
+            }
+        
+        return {
+            'success': True,
+            'file_path': self.file_path,
+            'audio_analysis': {
+                'spectrogram_path': self.spectrogram_path,
+                'features': self.features,
+            },
+            'ai_explanation': {
+                'success': self.ai_success,
+                'content': self.ai_content,
+                'error': self.ai_error
+            },
+            'metadata': {
+                'model_used': self.model_used,
+                'analysis_timestamp': self.timestamp,
+                'custom_question': self.custom_question
+            }
+        }
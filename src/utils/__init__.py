@@ -2,5 +2,14 @@
 
 from .validators import validate_audio_file
 from .guardrails import ContentFilter
+from .response_cache import ResponseCache, get_response_cache
+from .formatting import AUDIO_FIELD_FORMATTERS, format_audio_features
 
-__all__ = ["validate_audio_file", "ContentFilter"]
+__all__ = [
+    "validate_audio_file",
+    "ContentFilter",
+    "ResponseCache",
+    "get_response_cache",
+    "AUDIO_FIELD_FORMATTERS",
+    "format_audio_features",
+]
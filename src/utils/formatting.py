@@ -0,0 +1,31 @@
+"""Text formatting helpers shared by the LLM client and services"""
+
+from typing import Any, Dict, Tuple
+
+# (feature key, label, value format) for the features included in LLM context
+AUDIO_FIELD_FORMATTERS: Tuple[Tuple[str, str, str], ...] = (
+    ("duration", "Duration", "{:.2f} seconds"),
+    ("tempo", "Tempo", "{:.1f} BPM"),
+    ("spectral_centroid", "Spectral Centroid", "{:.1f} Hz"),
+    ("rms_energy", "RMS Energy", "{:.4f}"),
+)
+
+
+def format_audio_features(features: Dict[str, Any], header: str) -> str:
+    """
+    Format the key audio features as a bulleted block of text
+    
+    Args:
+        features: Audio features from AudioProcessor.extract_audio_features
+        header: First line of the block
+    
+    Returns:
+        Header followed by one "- Label: value" line per available feature
+    """
+    parts = [header]
+    parts.extend(
+        f"- {label}: {fmt.format(features[key])}"
+        for key, label, fmt in AUDIO_FIELD_FORMATTERS
+        if key in features
+    )
+    return "\n".join(parts)
@@ -2,18 +2,30 @@
 
 import re
 import logging
-from typing import List, Dict, Set
+import threading
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Set, Tuple
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
+_WORD_PATTERN = re.compile(r'\b\w+\b')
+
+# Short acknowledgments that are allowed without any audio terms
+_SHORT_RESPONSES = frozenset({'ok', 'yes', 'no', 'hello', 'thanks', 'thank you'})
+
 
 class ContentFilter:
     """Content filter with safety guardrails for LLM interactions"""
     
-    def __init__(self):
+    def __init__(self) -> None:
         self.setup_filters()
     
-    def setup_filters(self):
+    def setup_filters(self) -> None:
         """Setup content filtering patterns and rules"""
         
         # Inappropriate content patterns (basic filtering)
@@ -23,18 +35,45 @@ class ContentFilter:
             r'\b(?:personal\s+information|private\s+data|ssn|credit\s+card)\b',
         ]
         
-        # Compile patterns for efficiency
+        # Compile all patterns into one alternation so content is scanned once
+        self.inappropriate_regex = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.inappropriate_patterns),
+            re.IGNORECASE
+        )
+        
+        # Individually compiled patterns, kept for callers that inspect them;
+        # is_safe_content only uses the fused inappropriate_regex
         self.compiled_patterns = [
             re.compile(pattern, re.IGNORECASE) for pattern in self.inappropriate_patterns
         ]
         
+        # Optional Hyperscan database scanning for all patterns in one DFA pass
+        self._hs_db = self._build_hyperscan_database(self.inappropriate_patterns)
+        self._hs_local = threading.local()
+        
+        # Per-instance result cache for check_and_filter (a cache on the method
+        # itself would be shared by, and keep alive, every ContentFilter)
+        self.check_and_filter = lru_cache(maxsize=4096)(self._check_and_filter)
+        
+        # Sensitive data patterns, replaced by _remove_sensitive_data
+        self._email_regex = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+        self._phone_regex = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+        self._url_regex = re.compile(r'https?://(?!(?:wikipedia|github|docs\.python|librosa))\S+')
+        self._digit_regex = re.compile(r'\d')
+        
+        # Formatting patterns used by _clean_formatting
+        self._whitespace_regex = re.compile(r'\s+')
+        self._punctuation_regex = re.compile(r'[!?]{3,}')
+        self._ellipsis_regex = re.compile(r'\.{4,}')
+        self._line_break_regex = re.compile(r'\n{3,}')
+        
         # Topics we want to keep focused on audio analysis
-        self.allowed_topics = {
+        self.allowed_topics = frozenset({
             'audio', 'spectrogram', 'frequency', 'sound', 'music', 'acoustic',
             'signal', 'processing', 'analysis', 'waveform', 'amplitude',
             'decibel', 'hertz', 'pitch', 'tone', 'harmony', 'rhythm',
             'tempo', 'beat', 'melody', 'voice', 'speech', 'recording'
-        }
+        })
         
         # System prompts for focused responses
         self.system_context = """
@@ -57,32 +96,74 @@ class ContentFilter:
         Returns:
             True if content is safe, False otherwise
         """
-        if not content or not content.strip():
+        if not content or content.isspace():
             return True
         
-        content_lower = content.lower()
-        
-        # Check for inappropriate patterns
-        for pattern in self.compiled_patterns:
-            if pattern.search(content_lower):
-                logger.warning(f"Content failed safety check: inappropriate pattern detected")
-                return False
-        
-        # Check for extremely long content that might be spam
+        # Check for extremely long content that might be spam (before any scanning)
         if len(content) > 5000:
             logger.warning("Content failed safety check: too long")
             return False
         
+        # Check for inappropriate patterns
+        if self._contains_inappropriate(content):
+            logger.warning("Content failed safety check: inappropriate pattern detected")
+            return False
+        
         # Check for repetitive content (potential spam)
-        words = content_lower.split()
+        words = content.lower().split()
         if len(words) > 10:
-            unique_words = set(words)
-            if len(unique_words) / len(words) < 0.3:  # Less than 30% unique words
+            if len(set(words)) * 10 < len(words) * 3:  # Less than 30% unique words
                 logger.warning("Content failed safety check: too repetitive")
                 return False
         
         return True
     
+    @staticmethod
+    def _build_hyperscan_database(patterns: List[str]) -> Any:
+        """Compile patterns into a Hyperscan block-mode database, if available"""
+        if hyperscan is None:
+            return None
+        
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8
+        try:
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[pattern.encode("utf-8") for pattern in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[flags] * len(patterns)
+            )
+        except hyperscan.error as e:
+            logger.warning(f"Hyperscan cannot compile content patterns, using re: {str(e)}")
+            return None
+        
+        return database
+    
+    def _contains_inappropriate(self, content: str) -> bool:
+        """Check content against the inappropriate-content patterns"""
+        # Hyperscan's \s, \b and case folding are ASCII-only, so it only
+        # agrees with inappropriate_regex on ASCII content
+        if self._hs_db is None or not content.isascii():
+            return self.inappropriate_regex.search(content) is not None
+        
+        # Scratch space must not be shared between concurrent scans
+        scratch = getattr(self._hs_local, "scratch", None)
+        if scratch is None:
+            scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+        
+        matched: List[int] = []
+        
+        def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> bool:
+            matched.append(pattern_id)
+            return True  # stop scanning at the first match
+        
+        try:
+            self._hs_db.scan(content.encode("utf-8"), match_event_handler=on_match, scratch=scratch)
+        except hyperscan.ScanTerminated:
+            pass
+        
+        return bool(matched)
+    
     def filter_content(self, content: str) -> str:
         """
         Filter and clean content
@@ -93,8 +174,12 @@ class ContentFilter:
         Returns:
             Filtered content
         """
+        return self._filter_content(content)[0]
+    
+    def _filter_content(self, content: str) -> Tuple[str, bool]:
+        """Filter content and report whether it was found on topic"""
         if not content:
-            return content
+            return content, True
         
         # Remove potential sensitive data patterns
         filtered = self._remove_sensitive_data(content)
@@ -105,24 +190,61 @@ class ContentFilter:
         # Ensure content stays on topic (basic check)
         if not self._is_on_topic(filtered):
             logger.info("Content appears off-topic, adding context note")
-            filtered = self._add_topic_redirect(filtered)
+            return self._add_topic_redirect(filtered), False
+        
+        return filtered, True
+    
+    def filter_partial_content(self, content: str) -> str:
+        """
+        Filter a fragment of a streamed response
+        
+        Only sensitive data is removed; formatting and topic checks need the
+        complete response.
         
-        return filtered
+        Args:
+            content: Content fragment to filter
+            
+        Returns:
+            Filtered content fragment
+        """
+        if not content:
+            return content
+        return self._remove_sensitive_data(content)
+    
+    def _check_and_filter(self, content: str) -> Optional[str]:
+        """
+        Safety-check and filter content; cached per instance as check_and_filter
+        
+        System prompts and conversation history are sent with every request,
+        so the same content is checked repeatedly.
+        
+        Args:
+            content: Content to check and filter
+            
+        Returns:
+            Filtered content, or None if content is not safe
+        """
+        if not self.is_safe_content(content):
+            return None
+        return self.filter_content(content)
     
     def _remove_sensitive_data(self, content: str) -> str:
         """Remove potential sensitive data patterns"""
         
+        # Most content has no email addresses or phone numbers; cheap checks for
+        # '@' and for any digit skip those substitutions. (The URL pattern
+        # starts with a literal, so re already rejects it quickly.)
+        
         # Remove potential email addresses
-        content = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 
-                        '[EMAIL_REMOVED]', content)
+        if '@' in content:
+            content = self._email_regex.sub('[EMAIL_REMOVED]', content)
         
         # Remove potential phone numbers
-        content = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', 
-                        '[PHONE_REMOVED]', content)
+        if self._digit_regex.search(content):
+            content = self._phone_regex.sub('[PHONE_REMOVED]', content)
         
         # Remove potential URLs (keep only safe domains)
-        content = re.sub(r'https?://(?!(?:wikipedia|github|docs\.python|librosa))[^\s]+', 
-                        '[URL_REMOVED]', content)
+        content = self._url_regex.sub('[URL_REMOVED]', content)
         
         return content
     
@@ -130,39 +252,38 @@ class ContentFilter:
         """Clean up content formatting"""
         
         # Remove excessive whitespace
-        content = re.sub(r'\s+', ' ', content)
+        content = self._whitespace_regex.sub(' ', content)
         
         # Remove excessive punctuation
-        content = re.sub(r'[!?]{3,}', '!', content)
-        content = re.sub(r'\.{4,}', '...', content)
+        content = self._punctuation_regex.sub('!', content)
+        content = self._ellipsis_regex.sub('...', content)
         
         # Clean up line breaks
-        content = re.sub(r'\n{3,}', '\n\n', content)
+        content = self._line_break_regex.sub('\n\n', content)
         
         return content.strip()
     
     def _is_on_topic(self, content: str) -> bool:
         """Check if content is related to audio analysis"""
         content_lower = content.lower()
-        words = set(re.findall(r'\b\w+\b', content_lower))
         
-        # Check if any audio-related terms are present
-        audio_terms_found = words.intersection(self.allowed_topics)
+        # Short content needs one distinct audio term, longer content needs two;
+        # stop scanning as soon as enough have been seen
+        required_terms = 1 if len(content) < 200 else 2
+        audio_terms_found: Set[str] = set()
+        for match in _WORD_PATTERN.finditer(content_lower):
+            word = match.group()
+            if word in self.allowed_topics:
+                audio_terms_found.add(word)
+                if len(audio_terms_found) >= required_terms:
+                    return True
         
-        # If it's a short response and has at least one audio term, consider it on-topic
-        if len(content) < 200 and len(audio_terms_found) > 0:
-            return True
-        
-        # For longer content, require more audio-related terms
         if len(content) >= 200:
-            return len(audio_terms_found) >= 2
+            return False
         
         # If no audio terms but short and seems like acknowledgment, allow it
-        short_responses = {'ok', 'yes', 'no', 'hello', 'thanks', 'thank you'}
-        if len(words) <= 3 and any(word in short_responses for word in words):
-            return True
-        
-        return len(audio_terms_found) > 0
+        words = set(_WORD_PATTERN.findall(content_lower))
+        return len(words) <= 3 and not words.isdisjoint(_SHORT_RESPONSES)
     
     def _add_topic_redirect(self, content: str) -> str:
         """Add a note to redirect conversation back to audio topics"""
@@ -178,7 +299,7 @@ class ContentFilter:
         """Get the system prompt for maintaining conversation focus"""
         return self.system_context
     
-    def validate_question(self, question: str) -> Dict[str, any]:
+    def validate_question(self, question: str) -> Dict[str, Any]:
         """
         Validate a user question before sending to LLM
         
@@ -195,11 +316,12 @@ class ContentFilter:
                 'modified_question': None
             }
         
-        # Clean the question
-        cleaned_question = self.filter_content(question)
+        # Clean the question; on-topic questions come back unchanged, so only
+        # a redirected question needs another topic check
+        cleaned_question, on_topic = self._filter_content(question)
         
         # If question is completely off-topic, suggest alternatives
-        if not self._is_on_topic(cleaned_question):
+        if not on_topic and not self._is_on_topic(cleaned_question):
             return {
                 'is_valid': True,
                 'reason': 'Question is off-topic but allowed',
@@ -0,0 +1,94 @@
+"""Exact-match cache for LLM chat completion results"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Cache of successful chat completion results keyed by request content
+    
+    Entries live in an in-memory LRU. When a directory is given and the
+    optional ``diskcache`` package is installed, entries are also persisted
+    there so they survive across processes.
+    """
+    
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        
+        if directory:
+            try:
+                import diskcache
+                self._disk = diskcache.Cache(directory)
+            except ImportError:
+                logger.warning("diskcache is not installed; response cache is memory-only")
+    
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """
+        Build a cache key from a request payload
+        
+        Args:
+            payload: API request payload (model, messages, temperature, ...)
+        
+        Returns:
+            SHA-256 hex digest of the canonicalised payload
+        """
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for a key, or None"""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+        
+        if value is None and self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self._remember(key, value)
+        
+        return dict(value) if value is not None else None
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a result under a key"""
+        self._remember(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+    
+    def clear(self):
+        """Remove all cached results"""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+    
+    def _remember(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache"""
+    from ..config import get_settings
+    
+    settings = get_settings()
+    return ResponseCache(
+        max_entries=settings.response_cache_size,
+        directory=settings.response_cache_dir
+    )
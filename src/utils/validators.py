@@ -1,14 +1,19 @@
 """File validation utilities"""
 
 import os
+import stat
 import logging
 from pathlib import Path
 from typing import Union
 
 logger = logging.getLogger(__name__)
 
+# Characters that are not allowed in filenames, mapped to underscores
+_INVALID_FILENAME_CHARS = '<>:"/\\|?*'
+_SANITIZE_TABLE = str.maketrans(_INVALID_FILENAME_CHARS, '_' * len(_INVALID_FILENAME_CHARS))
 
-def validate_audio_file(file_path: Union[str, Path], settings) -> bool:
+
+def validate_audio_file(file_path: Union[str, Path], settings) -> os.stat_result:
     """
     Validate that an audio file exists and meets requirements
     
@@ -17,7 +22,8 @@ def validate_audio_file(file_path: Union[str, Path], settings) -> bool:
         settings: Application settings object
         
     Returns:
-        True if file is valid
+        The file's stat result (always truthy), for callers that need its
+        size or modification time without another stat call
         
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -25,12 +31,14 @@ def validate_audio_file(file_path: Union[str, Path], settings) -> bool:
     """
     file_path = Path(file_path)
     
-    # Check if file exists
-    if not file_path.exists():
+    # One stat call answers existence, file type and size
+    try:
+        file_stat = file_path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Audio file not found: {file_path}")
     
     # Check if it's a file (not directory)
-    if not file_path.is_file():
+    if not stat.S_ISREG(file_stat.st_mode):
         raise ValueError(f"Path is not a file: {file_path}")
     
     # Check file extension
@@ -38,23 +46,22 @@ def validate_audio_file(file_path: Union[str, Path], settings) -> bool:
     if file_extension not in settings.supported_formats:
         raise ValueError(
             f"Unsupported file format: {file_extension}. "
-            f"Supported formats: {', '.join(settings.supported_formats)}"
+            f"Supported formats: {', '.join(sorted(settings.supported_formats))}"
         )
     
     # Check file size
-    file_size_mb = file_path.stat().st_size / (1024 * 1024)
+    file_size_mb = file_stat.st_size / (1024 * 1024)
     if file_size_mb > settings.allowed_file_size_mb:
         raise ValueError(
             f"File size ({file_size_mb:.1f} MB) exceeds maximum allowed "
             f"size ({settings.allowed_file_size_mb} MB)"
         )
     
-    # Check file permissions
-    if not os.access(file_path, os.R_OK):
-        raise ValueError(f"Cannot read file: {file_path}")
+    # Read permission is not checked separately; opening the file for
+    # decoding raises PermissionError if it cannot be read
     
     logger.info(f"Audio file validation passed: {file_path}")
-    return True
+    return file_stat
 
 
 def validate_output_path(output_path: Union[str, Path]) -> bool:
@@ -103,13 +110,8 @@ def sanitize_filename(filename: str, max_length: int = 255) -> str:
     Returns:
         Sanitized filename
     """
-    # Characters that are not allowed in filenames
-    invalid_chars = '<>:"/\\|?*'
-    
     # Replace invalid characters with underscore
-    sanitized = filename
-    for char in invalid_chars:
-        sanitized = sanitized.replace(char, '_')
+    sanitized = filename.translate(_SANITIZE_TABLE)
     
     # Remove leading/trailing whitespace and dots
     sanitized = sanitized.strip(' .')
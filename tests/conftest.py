@@ -0,0 +1,31 @@
+"""Shared pytest fixtures"""
+
+import pytest
+
+from src.config import get_settings
+from src.core import get_mistral_client
+
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    """
+    Point the settings at a throwaway environment
+    
+    Returns a function that sets extra environment variables; the cached
+    settings and sync client are rebuilt so every test sees its own values.
+    """
+    monkeypatch.setenv("ENV_FILE", str(tmp_path / "missing.env"))
+    monkeypatch.setenv("MISTRAL_API_KEY", "test-key-0123456789")
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("TEMP_DIR", str(tmp_path / "temp"))
+    
+    def set_env(**values: str):
+        for name, value in values.items():
+            monkeypatch.setenv(name, value)
+        get_settings.cache_clear()
+        get_mistral_client.cache_clear()
+    
+    set_env()
+    yield set_env
+    get_settings.cache_clear()
+    get_mistral_client.cache_clear()
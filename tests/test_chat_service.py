@@ -0,0 +1,117 @@
+"""Tests for ChatService message building and async client lifetime"""
+
+import asyncio
+
+from src.services import ChatService, chat_service
+
+
+AUDIO_FEATURES = {'duration': 12.5, 'tempo': 120.0, 'spectral_centroid': 1500.0}
+
+
+class RecordingClient:
+    """Stand-in for MistralClient that records the messages it is sent"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def chat_completion(self, messages):
+        self.requests.append(messages)
+        return {'success': True, 'content': f"Answer {len(self.requests)}", 'usage': {}}
+
+
+class FakeAsyncClient:
+    """Stand-in for MistralAsyncClient that records whether it was closed"""
+    
+    instances = []
+    requests = []
+    
+    def __init__(self):
+        self.closed = False
+        FakeAsyncClient.instances.append(self)
+    
+    async def chat_completion(self, messages):
+        assert not self.closed
+        FakeAsyncClient.requests.append(messages)
+        return {'success': True, 'content': "Answer", 'usage': {}}
+    
+    async def aclose(self):
+        self.closed = True
+
+
+def assert_valid_role_order(messages):
+    """Check the ordering rules Mistral's message validation applies"""
+    roles = [message['role'] for message in messages]
+    assert 'system' not in roles[1:], roles
+    for previous, role in zip(roles, roles[1:]):
+        if previous == 'assistant':
+            assert role in ('user', 'assistant', 'tool'), roles
+    assert roles[-1] == 'user', roles
+
+
+def test_audio_context_keeps_valid_role_order_across_turns(env):
+    env(ENABLE_RESPONSE_CACHE="false")
+    service = ChatService()
+    service.mistral_client = client = RecordingClient()
+    
+    first = service.ask_about_audio("What is the tempo of this track?", AUDIO_FEATURES)
+    second = service.ask_about_audio("Is the spectral centroid high for music?", AUDIO_FEATURES)
+    
+    assert first['success'] and second['success']
+    assert [[m['role'] for m in request] for request in client.requests] == [
+        ['system', 'user'],
+        ['system', 'user', 'assistant', 'user'],
+    ]
+    for request in client.requests:
+        assert_valid_role_order(request)
+        assert request[-1]['content'].startswith("Current audio analysis context:")
+    
+    # The history holds the plain question, so the prefix is stable across turns
+    assert client.requests[1][:2] == client.requests[0][:1] + [
+        {'role': 'user', 'content': "What is the tempo of this track?"}
+    ]
+
+
+def test_async_calls_close_their_client(env, monkeypatch):
+    env(ENABLE_RESPONSE_CACHE="false")
+    monkeypatch.setattr(chat_service, "MistralAsyncClient", FakeAsyncClient)
+    FakeAsyncClient.instances = []
+    service = ChatService()
+    
+    # Each standalone call, in its own event loop, closes its client
+    for _ in range(2):
+        assert asyncio.run(service.asend_message("What is the tempo of this track?"))['success']
+    assert [client.closed for client in FakeAsyncClient.instances] == [True, True]
+    assert service._async_client is None
+    
+    async def session():
+        async with service:
+            await service.asend_message("What is timbre?")
+            await service.send_messages(["What is pitch?", "What is loudness?"])
+            assert not FakeAsyncClient.instances[-1].closed
+    
+    # Calls inside `async with` share one client, closed when the block exits
+    asyncio.run(session())
+    assert len(FakeAsyncClient.instances) == 3
+    assert FakeAsyncClient.instances[-1].closed
+
+
+def test_send_messages_builds_every_message_from_the_starting_history(env, monkeypatch):
+    monkeypatch.setattr(chat_service, "MistralAsyncClient", FakeAsyncClient)
+    FakeAsyncClient.requests = []
+    service = ChatService()
+    
+    # Answer the first question once so the batch gets a chat cache hit for it
+    asyncio.run(service.asend_message("What is the tempo of this track?"))
+    service.clear_conversation()
+    FakeAsyncClient.requests = []
+    
+    results = asyncio.run(service.send_messages([
+        "What is the tempo of this track?",
+        "What is timbre?",
+    ]))
+    
+    assert [result['success'] for result in results] == [True, True]
+    assert [[m['role'] for m in request] for request in FakeAsyncClient.requests] == [
+        ['system', 'user']
+    ]
+    assert len(service.conversation_history) == 2
@@ -0,0 +1,178 @@
+"""Tests for the Mistral clients' request handling"""
+
+import asyncio
+import gc
+import threading
+import weakref
+
+import pytest
+
+from src.core import BatchedMistralClient, MistralAsyncClient, MistralClient
+from src.utils import json_codec
+
+
+MESSAGES = [{'role': 'user', 'content': "What is the tempo of this track?"}]
+
+
+class LeaderFailed(Exception):
+    pass
+
+
+@pytest.fixture
+def no_gc():
+    """Disable the cycle collector so only reference counting frees objects"""
+    gc.disable()
+    yield
+    gc.enable()
+
+
+def test_sync_coalescing_does_not_keep_an_unshared_failure(env, no_gc):
+    client = MistralClient()
+    futures = []
+    
+    def fail(*args):
+        futures.append(weakref.ref(next(iter(client._inflight.values()))))
+        raise LeaderFailed()
+    
+    client._chat_completion = fail
+    with pytest.raises(LeaderFailed):
+        client.chat_completion(MESSAGES)
+    
+    assert futures[0]() is None
+    assert not client._inflight and not client._inflight_waiters
+
+
+def test_sync_coalescing_hands_the_failure_to_waiting_callers(env):
+    client = MistralClient()
+    started, release = threading.Event(), threading.Event()
+    
+    def fail(*args):
+        started.set()
+        release.wait(5)
+        raise LeaderFailed()
+    
+    client._chat_completion = fail
+    errors = []
+    
+    def call():
+        try:
+            client.chat_completion(MESSAGES)
+        except LeaderFailed as e:
+            errors.append(e)
+    
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while not client._inflight_waiters.get(next(iter(client._inflight))):
+        pass
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    
+    assert len(errors) == 2
+    assert not client._inflight and not client._inflight_waiters
+
+
+def test_async_coalescing_does_not_set_an_unretrieved_failure(env):
+    client = MistralAsyncClient()
+    futures = []
+    
+    async def fail(*args):
+        futures.append(next(iter(client._inflight.values())))
+        raise LeaderFailed()
+    
+    client._chat_completion = fail
+    with pytest.raises(LeaderFailed):
+        asyncio.run(client.chat_completion(MESSAGES))
+    
+    # Nobody waited, so the exception was not stored for a caller to retrieve
+    assert not futures[0].done()
+    assert not client._inflight and not client._inflight_waiters
+
+
+def test_async_coalescing_hands_the_failure_to_waiting_callers(env):
+    client = MistralAsyncClient()
+    
+    async def fail(*args):
+        await asyncio.sleep(0.01)
+        raise LeaderFailed()
+    
+    client._chat_completion = fail
+    
+    async def run():
+        return await asyncio.gather(
+            client.chat_completion(MESSAGES),
+            client.chat_completion(MESSAGES),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [LeaderFailed, LeaderFailed]
+    assert not client._inflight and not client._inflight_waiters
+
+
+def test_batched_questions_survive_filtering_as_numbered_json(env):
+    client = BatchedMistralClient(batch_window=0.05)
+    questions = [
+        "What does --- mean in an audio\n\nspectrogram?",
+        "Is the frequency resolution at https://example.com/a\"b ok for audio?",
+        "What is the tempo of this audio?",
+    ]
+    payloads = []
+    
+    async def post(payload):
+        payloads.append(payload)
+        answers = [f"Audio answer {number}" for number in range(1, len(questions) + 1)]
+        body = {
+            'choices': [{'message': {'content': json_codec.dumps(answers).decode("utf-8")}}],
+            'usage': {},
+            'model': 'test'
+        }
+        return 200, json_codec.dumps(body), None
+    
+    client._post = post
+    
+    async def run():
+        async with client:
+            return await asyncio.gather(*[client.ask_question(question) for question in questions])
+    
+    results = asyncio.run(run())
+    
+    assert len(payloads) == 1
+    sent = json_codec.loads(payloads[0]['messages'][1]['content'])
+    assert [item['number'] for item in sent] == [1, 2, 3]
+    assert sent[0]['question'] == "What does --- mean in an audio spectrogram?"
+    assert "[URL_REMOVED]" in sent[1]['question']
+    assert [result['content'] for result in results] == [
+        "Audio answer 1", "Audio answer 2", "Audio answer 3"
+    ]
+
+
+class RecordingSession:
+    """Stand-in for the requests session that records request bodies"""
+    
+    def __init__(self):
+        self.bodies = []
+    
+    def post(self, url, data, timeout):
+        self.bodies.append(data)
+        body = {'choices': [{'message': {'content': "A spectrogram shows audio frequency over time."}}]}
+        return type("Response", (), {'status_code': 200, 'content': json_codec.dumps(body)})()
+
+
+def test_payload_never_sends_cache_control(env):
+    env(ENABLE_RESPONSE_CACHE="false")
+    client = MistralClient()
+    client.session = session = RecordingSession()
+    
+    assert client.explain_spectrogram({'duration': 3.0})['success']
+    assert client.chat_completion([
+        {'role': 'system', 'content': "You explain audio.", 'cache_control': {'type': 'ephemeral'}},
+        {'role': 'user', 'content': "What is a spectrogram?"}
+    ])['success']
+    
+    for body in session.bodies:
+        assert b"cache_control" not in body
+        assert {tuple(message) for message in json_codec.loads(body)['messages']} == {('role', 'content')}